@@ -0,0 +1,292 @@
+"""
+Benchmarks of dictionary loading, Word queries and Statistics counting.
+
+Run from the root of the repository:
+
+    python -m benchmarks.run                              # default suite, results as JSON to stdout
+    python -m benchmarks.run --sizes 64K,1M,1G -o out.json  # Statistics on bigger texts, results to the file
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Each benchmark is repeated and the best and the median times are reported (in seconds). With --compare the results
+are compared with stored ones by the best time, the exit code is 1 if some benchmark is slower than threshold allows.
+Store new baseline with --output benchmarks/baseline.json on the same machine, times of different machines are not
+comparable
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from itertools import chain
+from statistics import median
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.chumba.dictionary import ENGINES, Dictionary, get_dictionary
+from src.chumba.index import numpy
+from src.chumba.statistic import Statistics
+from src.chumba.utils import read_data_file
+from src.chumba.word import Word
+
+SIZES = '64K,1M,16M'
+# texts bigger than this are counted only from the file, not kept in memory
+IN_MEMORY = 64 << 20
+MINIMUM = 0.05
+_UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+_PUNCTUATION = (' ', ' ', ' ', ' ', ' ', ' ', ', ', '. ', '\n', ' - ')
+
+
+def _query(build: Callable[[], Word]) -> Callable[[], List[str]]:
+    return lambda: build().examples(-1)
+
+
+def _mixes(lang: str, engine: str) -> Dict[str, Callable[[], Word]]:
+    is_ru = lang == 'ru'
+    a, b, c = ('а', 'р', 'т') if is_ru else ('a', 'r', 't')
+
+    def letters():
+        word = Word(7, is_ru, engine)
+        word.letter_at_index_is(0, 'п' if is_ru else 'p')
+        word.letter_at_index_is(3, 'е' if is_ru else 'e')
+        return word
+
+    def prefix_suffix():
+        word = Word(0, is_ru, engine)
+        word.starts_with('пере' if is_ru else 'over')
+        word.ends_with('ние' if is_ru else 'ing')
+        return word
+
+    def contains():
+        word = Word(6, is_ru, engine)
+        word.contains(a, b, c)
+        word.not_contains('о' if is_ru else 'o')
+        return word
+
+    return {
+        'all': lambda: Word(0, is_ru, engine),
+        'length': lambda: Word(5, is_ru, engine),
+        'pattern': lambda: Word.pattern('к?т*' if is_ru else 'c?t*', is_ru, engine),
+        'letters': letters,
+        'prefix_suffix': prefix_suffix,
+        'contains': contains,
+        'regex': lambda: Word.regex('.*(ость|ение)' if is_ru else '.*(ness|tion)', is_ru, engine),
+    }
+
+
+def _many(lang: str) -> List[str]:
+    if lang == 'ru':
+        return ['к?т*', '__ш__', 'ма*', '*ция', 'п__е___', '*а*б*', 'с____', 'о*ть']
+    return ['c?t*', '__sh_', 'ma*', '*tion', 'p__e___', '*a*b*', 's____', 'o*ly']
+
+
+def word_benchmarks(langs: List[str], engines: List[str]) -> Iterator[Tuple[str, Callable[[], Any],
+                                                                          Optional[Callable[[], None]]]]:
+    """
+    Benchmarks of Word queries, result cache of the index is cleared before each run, so queries are evaluated
+    :param langs: langs of dictionaries
+    :param engines: names of engines
+    :return: iterator of names, functions to measure and functions to prepare each run
+    """
+    for lang in langs:
+        yield f'dictionary/read/{lang}', lambda lang=lang: read_data_file(lang), None
+        words = get_dictionary(lang).words
+        for engine in engines:
+            yield f'dictionary/index/{lang}/{engine}', lambda w=words, e=engine: Dictionary('bench', w).index(e), None
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, f'{lang}.chumba')
+            get_dictionary(lang).save(path)
+            with open(path, 'rb') as file:
+                data = file.read()
+        yield f'dictionary/load/{lang}', lambda d=data, l=lang: _load_saved(d, l), None
+        for engine in engines:
+            # pylint: disable=protected-access
+            clear = get_dictionary(lang).index(engine)._results.clear
+            for name, build in _mixes(lang, engine).items():
+                yield f'word/{lang}/{engine}/{name}', _query(build), clear
+            queries = [lambda p=p, e=engine, l=lang: Word.pattern(p, l == 'ru', e) for p in _many(lang)]
+            yield f'word/{lang}/{engine}/many', lambda q=queries: Word.examples_many(e() for e in q), clear
+
+
+def _load_saved(data: bytes, lang: str) -> Dictionary:
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, f'{lang}.chumba')
+        with open(path, 'wb') as file:
+            file.write(data)
+        dictionary = Dictionary.load(path)
+        dictionary.index()
+        return dictionary
+
+
+def synthetic_text(size: int, seed: int = 0, lang: str = 'ru') -> Iterator[str]:
+    """
+    Generates reproducible text of approximately given size (in characters) by chunks: words of the dictionary with
+    Zipf-like frequencies, separated by spaces, punctuation and line breaks
+    :param size: size of the text in characters
+    :param seed: seed of the random generator
+    :param lang: lang of the dictionary for words
+    :return: iterator of chunks of the text
+    """
+    generator = random.Random(seed)
+    words = list(get_dictionary(lang).words)
+    generator.shuffle(words)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    written = 0
+    while written < size:
+        chosen = generator.choices(words, weights, k=4096)
+        separators = generator.choices(_PUNCTUATION, k=4096)
+        chunk = ''.join(w + s for w, s in zip(chosen, separators))[:size - written]
+        written += len(chunk)
+        yield chunk
+
+
+def statistics_benchmarks(sizes: List[int], folder: str) -> Iterator[Tuple[str, Callable[[], Any], None]]:
+    """
+    Benchmarks of Statistics on synthetic texts of given sizes: counting of the text in memory (full and lean) and
+    counting of the file by chunks
+    :param sizes: sizes of texts in characters
+    :param folder: folder for text files
+    :return: iterator of names, functions to measure and functions to prepare each run
+    """
+    for size in sizes:
+        label = _label(size)
+        path = os.path.join(folder, f'text_{label}.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            for chunk in synthetic_text(size):
+                file.write(chunk)
+        if size <= IN_MEMORY:
+            with open(path, encoding='utf-8') as file:
+                text = file.read()
+            yield f'statistics/text/{label}', lambda t=text: Statistics(t), None
+            yield f'statistics/lean/{label}', lambda t=text: Statistics(t, keep_words=False), None
+        yield f'statistics/stream/{label}', lambda p=path: Statistics.from_stream(p), None
+
+
+def measure(function: Callable[[], Any], prepare: Optional[Callable[[], None]], repeat: int,
+            minimum: float = MINIMUM) -> Dict[str, Any]:
+    """
+    Runs function repeat times (prepare is called before each call and is not measured). Fast functions are called
+    many times in each run, until run takes at least minimum seconds, times are given per one call
+    :param function: function to measure
+    :param prepare: function to call before each call or None
+    :param repeat: number of runs
+    :param minimum: minimal time of one run in seconds
+    :return: best and median times of one call in seconds, number of runs and number of calls in each run
+    """
+    loops = 1
+    while _run(function, prepare, loops) < minimum and loops < 1 << 20:
+        loops *= 4
+    times = [_run(function, prepare, loops) / loops for _ in range(repeat)]
+    return {'best': min(times), 'median': median(times), 'repeat': repeat, 'loops': loops}
+
+
+def _run(function: Callable[[], Any], prepare: Optional[Callable[[], None]], loops: int) -> float:
+    # garbage collection is switched off while measuring like in timeit, otherwise it depends on previous benchmarks
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        total = 0.0
+        for _ in range(loops):
+            if prepare is not None:
+                prepare()
+            start = time.perf_counter()
+            function()
+            total += time.perf_counter() - start
+        return total
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Tuple[str, float, float]]:
+    """
+    Compares best times of results with the baseline, benchmarks missing in one of them are skipped
+    :param results: benchmarks of current run
+    :param baseline: stored benchmarks
+    :param threshold: allowed slowdown, 0.2 is 20% slower than the baseline
+    :return: list of names, ratios (current time / baseline time) and thresholds of benchmarks slower than allowed
+    """
+    slower = []
+    for name, result in results.items():
+        stored = baseline.get(name)
+        if stored is None or not stored['best']:
+            continue
+        ratio = result['best'] / stored['best']
+        if ratio > 1 + threshold:
+            slower.append((name, ratio, threshold))
+    return slower
+
+
+def _size(value: str) -> int:
+    value = value.strip().upper()
+    if value[-1:] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(value)
+
+
+def _label(size: int) -> str:
+    for unit, factor in sorted(_UNITS.items(), key=lambda e: -e[1]):
+        if size >= factor and size % factor == 0:
+            return f'{size // factor}{unit}'
+    return str(size)
+
+
+def _meta() -> Dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'numpy': getattr(numpy, '__version__', None),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """
+    Runs benchmarks with command line arguments, see --help
+    :param arguments: command line arguments, sys.argv if None
+    :return: exit code, 1 if some benchmark is slower than the baseline allows
+    """
+    parser = argparse.ArgumentParser(description='Benchmarks of chumba')
+    parser.add_argument('--sizes', default=SIZES, help=f'sizes of texts for Statistics, {SIZES} by default')
+    parser.add_argument('--langs', default='ru,en', help='dictionaries for Word queries, ru,en by default')
+    parser.add_argument('--engines', default=','.join(ENGINES), help='engines for Word queries, all by default')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs of each benchmark, 5 by default')
+    parser.add_argument('--filter', default='', help='run only benchmarks with this substring in the name')
+    parser.add_argument('--output', '-o', help='file for JSON results, stdout if not given')
+    parser.add_argument('--compare', help='file with stored (baseline) results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown, 0.2 (20%%) by default')
+    options = parser.parse_args(arguments)
+    engines = [e for e in options.engines.split(',') if e and (e != 'numpy' or numpy is not None)]
+    sizes = [_size(e) for e in options.sizes.split(',') if e]
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as folder:
+        # benchmarks are generated one by one, so only one text is kept in memory at once
+        benchmarks = chain(word_benchmarks([e for e in options.langs.split(',') if e], engines),
+                           statistics_benchmarks(sizes, folder))
+        for name, function, prepare in benchmarks:
+            if options.filter in name:
+                results[name] = measure(function, prepare, options.repeat)
+                print(f'{name}: {results[name]["best"]:.6f}s', file=sys.stderr)
+    report = {'meta': _meta(), 'results': results}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    if options.compare:
+        with open(options.compare, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        slower = compare(results, baseline, options.threshold)
+        for name, ratio, threshold in slower:
+            print(f'SLOWER {name}: {ratio:.2f}x of baseline (allowed {1 + threshold:.2f}x)', file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
+from .dictionary import register_dictionary
 from .statistic import Statistics
 from .word import Word
 
-__all__ = ['Statistics', 'Word']
+__all__ = ['Statistics', 'Word', 'register_dictionary']
@@ -0,0 +1,133 @@
+import asyncio
+import codecs
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from .statistic import Statistics
+from .tokenizer import IGNORED, Tokenizer
+
+CHUNK_SIZE = 1 << 16
+
+
+class AsyncStatistics:
+    """
+    Asyncio ingestion of texts to one shared accumulating Statistics (lean, only counter and totals are kept).
+    Sources are files, texts and asyncio streams (any object with coroutine read(size), like asyncio.StreamReader).
+    Parsing and counting runs in the executor, off the event loop, while other sources are read, not more than
+    concurrency sources are ingested at once. Default executor of the loop is a pool of threads, so counting of
+    different sources overlaps with I/O, but not with each other, ProcessPoolExecutor counts them in parallel
+    """
+
+    def __init__(self, concurrency: int = 8, executor: Optional[Executor] = None, ignored=IGNORED,
+                 tokenizer: Optional[Tokenizer] = None):
+        """
+        Creates ingestion with empty statistic
+        :param concurrency: maximal number of sources ingested at once
+        :param executor: executor for reading of files and counting, default executor of the loop if None
+        :param ignored: sequence for ignore words, for string each symbol is a word
+        :param tokenizer: tokenizer for custom rules of parsing words, ignored argument is not used if it is given
+        :raises ValueError if concurrency is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError(f'Concurrency should be positive, got {concurrency}')
+        self.concurrency = concurrency
+        self.statistics = Statistics('', ignored, tokenizer, keep_words=False)
+        self._executor = executor
+        self._tokenizer = tokenizer or Tokenizer(ignored=ignored)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def add_text(self, text: str) -> None:
+        """
+        Counts words of the text in the executor and adds them to the statistic
+        :param text: string representation of some text
+        :return: None
+        """
+        async with self._slot():
+            self.statistics.update(await self._run(_count_text, self._tokenizer, text))
+
+    async def add_file(self, path: Union[str, Path], encoding: str = 'utf-8') -> None:
+        """
+        Reads and counts the text file in the executor (by chunks, like Statistics.from_stream) and adds its words to
+        the statistic
+        :param path: path to the text file
+        :param encoding: encoding of the file, UTF-8 by default
+        :return: None
+        """
+        async with self._slot():
+            self.statistics.update(await self._run(_count_file, self._tokenizer, path, encoding))
+
+    async def add_stream(self, stream: Any, encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Reads the stream of bytes till the end and adds its words to the statistic. Chunk is counted in the executor,
+        while the next chunk is read, words split between chunks are joined back
+        :param stream: object with coroutine read(size), which returns bytes, empty at the end of the stream
+        :param encoding: encoding of the stream, UTF-8 by default
+        :param chunk_size: size of the chunk (in bytes) for reading
+        :return: None
+        """
+        async with self._slot():
+            decoder = codecs.getincrementaldecoder(encoding)()
+            rest, counting = '', None
+            while True:
+                data = await stream.read(chunk_size)
+                text = rest + decoder.decode(data, final=not data)
+                border = self._tokenizer.border(text) if data else len(text)
+                rest = text[border:]
+                if counting is not None:
+                    self.statistics.update(await counting)
+                counting = asyncio.ensure_future(self._run(_count_text, self._tokenizer, text[:border]))
+                if not data:
+                    break
+            self.statistics.update(await counting)
+
+    async def add_files(self, paths: Iterable[Union[str, Path]], encoding: str = 'utf-8') -> None:
+        """
+        Adds all text files, not more than concurrency files at once
+        :param paths: paths to the text files
+        :param encoding: encoding of files, UTF-8 by default
+        :return: None
+        """
+        await asyncio.gather(*(self.add_file(path, encoding) for path in paths))
+
+    async def add_texts(self, texts: Iterable[str]) -> None:
+        """
+        Adds all texts, not more than concurrency texts at once
+        :param texts: iterable of texts (strings)
+        :return: None
+        """
+        await asyncio.gather(*(self.add_text(text) for text in texts))
+
+    def _slot(self) -> asyncio.Semaphore:
+        # semaphore is created in the running loop, older versions of asyncio bind it to the loop on creation
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _run(self, function, *args) -> Statistics:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+
+async def statistics_from_files(paths: Iterable[Union[str, Path]], concurrency: int = 8,
+                                executor: Optional[Executor] = None, ignored=IGNORED,
+                                encoding: str = 'utf-8') -> Statistics:
+    """
+    Creates one statistic object for all given text files under asyncio, see AsyncStatistics
+    :param paths: paths to the text files
+    :param concurrency: maximal number of files read at once
+    :param executor: executor for reading of files and counting, default executor of the loop if None
+    :param ignored: sequence for ignore words
+    :param encoding: encoding of files, UTF-8 by default
+    :return: Statistics object
+    """
+    ingestion = AsyncStatistics(concurrency, executor, ignored)
+    await ingestion.add_files(paths, encoding)
+    return ingestion.statistics
+
+
+def _count_text(tokenizer: Tokenizer, text: str) -> Statistics:
+    return Statistics(text, tokenizer=tokenizer, keep_words=False)
+
+
+def _count_file(tokenizer: Tokenizer, path: Union[str, Path], encoding: str) -> Statistics:
+    return Statistics.from_stream(path, encoding=encoding, tokenizer=tokenizer)
@@ -0,0 +1,120 @@
+import re
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Tuple
+
+LENGTH = 'length'
+LETTER = 'letter'
+PREFIX = 'prefix'
+SUFFIX = 'suffix'
+CONTAINS = 'contains'
+NOT_CONTAINS = 'not_contains'
+REGEX = 'regex'
+ANAGRAM = 'anagram'
+SUB_ANAGRAM = 'sub_anagram'
+SIMILAR = 'similar'
+ANY_LETTER = '_'
+ANY_LETTERS = '*'
+
+_CHECKS = {
+    LENGTH: lambda w, length: len(w) == length,
+    LETTER: lambda w, value: len(w) > value[0] and w[value[0]] == value[1],
+    PREFIX: lambda w, prefix: w.startswith(prefix),
+    SUFFIX: lambda w, postfix: w.endswith(postfix),
+    CONTAINS: lambda w, letter: letter in w,
+    NOT_CONTAINS: lambda w, letter: letter not in w,
+    REGEX: lambda w, expression: expression.fullmatch(w) is not None,
+    ANAGRAM: lambda w, signature: len(w) == len(signature) and letters_signature(w) == signature,
+    SUB_ANAGRAM: lambda w, letters: len(w) <= len(letters) and all(w.count(e) <= letters.count(e) for e in set(w)),
+    SIMILAR: lambda w, value: abs(len(w) - len(value[0])) <= value[1] and edit_distance(w, value[0]) <= value[1],
+}
+
+
+class Condition(NamedTuple):
+    """
+    One search condition of the Word: kind of the check (one of the constants of this module) and its value.
+    Conditions are hashable and comparable, so they can be compiled to index lookups or used as keys. Condition can be
+    called with a word to check it directly
+    """
+    kind: str
+    value: Any
+
+    def __call__(self, word: str) -> bool:
+        return _CHECKS[self.kind](word, self.value)
+
+
+def letters_signature(word: str) -> str:
+    """
+    Returns signature of the word: its letters in sorted order. Anagrams (words of the same letters) have the same
+    signature
+    :param word: any string
+    :return: string of sorted letters
+    """
+    return ''.join(sorted(word))
+
+
+def edit_distance(first: str, second: str) -> int:
+    """
+    Returns Levenshtein distance between two strings: minimal number of inserted, deleted or replaced symbols to get
+    the second string from the first one
+    :param first: any string
+    :param second: any string
+    :return: distance as int
+    """
+    row = list(range(len(second) + 1))
+    for i, letter in enumerate(first, start=1):
+        previous, row[0] = row[0], i
+        for j, other in enumerate(second, start=1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (letter != other))
+    return row[-1]
+
+
+def parse_pattern(pattern: str) -> List[Condition]:
+    """
+    Converts wildcard pattern to list of conditions. Each symbol of the pattern is a letter, '_' or '?' for any letter,
+    or '*' for any number of any letters (including none). For example, 'а_б__' is a word of 5 letters, with 'а' at
+    index 0 and 'б' at index 2, 'к?т*' is a word of 3 or more letters, starting with 'к' and with 'т' at index 2.
+    Patterns are normalized (lowered, '?' replaced with '_', repeated '*' collapsed) and compiled plans are cached, so
+    repeated patterns are not compiled again
+    :param pattern: string pattern
+    :return: list of conditions
+    :raises ValueError if pattern is empty
+    """
+    if not pattern:
+        raise ValueError('Pattern should not be empty')
+    normalized = re.sub(r'\*+', ANY_LETTERS, pattern.lower().replace('?', ANY_LETTER))
+    return list(_compile_pattern(normalized))
+
+
+def parse_regex(expression: str) -> List[Condition]:
+    """
+    Converts regular expression to list of conditions, whole word should match the expression (case is ignored).
+    Compiled expressions are cached
+    :param expression: regular expression
+    :return: list of conditions
+    :raises re.error if expression is not valid
+    """
+    return [_compile_regex(expression)]
+
+
+@lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str) -> Tuple[Condition, ...]:
+    if ANY_LETTERS not in pattern:
+        conditions = [Condition(LENGTH, len(pattern))]
+        conditions.extend(Condition(LETTER, (i, e)) for i, e in enumerate(pattern) if e != ANY_LETTER)
+        return tuple(conditions)
+    parts = pattern.split(ANY_LETTERS)
+    head, tail = parts[0], parts[-1]
+    conditions = [Condition(LETTER, (i, e)) for i, e in enumerate(head) if e != ANY_LETTER]
+    if ANY_LETTER in tail:
+        conditions.extend(Condition(CONTAINS, e) for e in sorted(set(tail) - {ANY_LETTER}))
+    elif tail:
+        conditions.append(Condition(SUFFIX, tail))
+    conditions.extend(Condition(CONTAINS, e) for e in sorted(set(''.join(parts[1:-1])) - {ANY_LETTER}))
+    expression = '.*'.join(''.join('.' if e == ANY_LETTER else re.escape(e) for e in part) for part in parts)
+    conditions.append(_compile_regex(expression))
+    return tuple(conditions)
+
+
+@lru_cache(maxsize=1024)
+def _compile_regex(expression: str) -> Condition:
+    return Condition(REGEX, re.compile(expression, re.IGNORECASE))
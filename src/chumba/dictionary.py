@@ -0,0 +1,230 @@
+import os
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .index import WordIndex
+from .matrix import MatrixIndex
+from .storage import read_sections, to_array, write_sections
+from .utils import read_data_file, read_file, Lang
+
+CACHE_SUFFIX = '.chumba'
+_DICTIONARY = 'dict'
+
+
+class Dictionary:
+    """
+    Read-only word store for one dictionary. Instances are shared between all Word objects of the process, so words
+    are never copied per query. For internal use, get instances with get_dictionary function
+    """
+
+    def __init__(self, name: str, words: Sequence[str], data: Optional[Dict[str, Any]] = None):
+        """
+        Creates dictionary from given words, words are stored as immutable tuple in given order
+        :param name: name of the dictionary, for bundled dictionaries it is lang (ru or en)
+        :param words: sequence of words (strings)
+        :param data: precomputed data of indexes (masks and orders), see WordIndex
+        """
+        self.name: str = name
+        self.words: Tuple[str, ...] = tuple(words)
+        self._data: Dict[str, Any] = data or {}
+        self._indexes: Dict[str, WordIndex] = {}
+        self._vocabulary: Optional[FrozenSet[str]] = None
+        self._lock = threading.Lock()
+
+    def save(self, path: Union[str, Path], source: Optional[Union[str, Path]] = None) -> None:
+        """
+        Saves words of the dictionary with precomputed data of the search index (letters masks, sorted orders for
+        prefixes and suffixes) to the binary file, which can be loaded with Dictionary.load
+        :param path: path to the file
+        :param source: path to the text file of the dictionary, its size and modification time are saved to check,
+        that saved data is for the same version of the source file
+        :return: None
+        :raises ValueError if some word contains line break
+        """
+        words = '\n'.join(self.words)
+        if words.count('\n') != max(len(self.words) - 1, 0):
+            raise ValueError('Words with line breaks can not be saved')
+        index = self.index()
+        prefixes, suffixes = index.orders()
+        write_sections(path, _DICTIONARY, {
+            'name': self.name.encode('utf-8'),
+            'words': words.encode('utf-8'),
+            'masks': index.masks(),
+            'prefixes': array('I', prefixes),
+            'suffixes': array('I', suffixes),
+            'source': array('Q', _stamp(source) if source else []),
+        })
+
+    @classmethod
+    def load(cls, path: Union[str, Path], name: Optional[str] = None,
+             source: Optional[Union[str, Path]] = None) -> 'Dictionary':
+        """
+        Loads dictionary from the binary file, saved with save method. File is read through memory map, search indexes
+        of the dictionary use saved data without computing it again
+        :param path: path to the file
+        :param name: name of the dictionary, saved name if None
+        :param source: path to the text file of the dictionary, if it is given, then file should be saved for it
+        :return: Dictionary object
+        :raises ValueError if file is not a dictionary file, it has unsupported format version, it is corrupted or it
+        was saved for another source file (or another version of it)
+        """
+        sections = read_sections(path, _DICTIONARY)
+        missing = [e for e in ('name', 'words', 'masks', 'prefixes', 'suffixes') if e not in sections]
+        if missing:
+            raise ValueError(f'File {path} has no sections {", ".join(missing)}')
+        saved = sections.get('source')
+        if source and (saved is None or list(to_array(saved, 'Q')) != _stamp(source)):
+            raise ValueError(f'File {path} is not saved for current version of {source}')
+        words = str(sections['words'], 'utf-8').split('\n') if len(sections['words']) else []
+        data = {
+            'masks': to_array(sections['masks'], 'Q'),
+            'orders': (to_array(sections['prefixes'], 'I'), to_array(sections['suffixes'], 'I')),
+        }
+        if any(len(e) != len(words) for e in (data['masks'], *data['orders'])):
+            raise ValueError(f'File {path} is corrupted, sizes of sections do not match number of words')
+        return cls(name or str(sections['name'], 'utf-8'), words, data)
+
+    def index(self, engine: str = 'index') -> WordIndex:
+        """
+        Search index of given engine over words of this dictionary, built once on first access and shared by all queries
+        :param engine: name of the engine, one of ENGINES keys
+        :return: WordIndex object
+        """
+        index = self._indexes.get(engine)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(engine)
+                if index is None:
+                    index = self._indexes[engine] = ENGINES[engine](self.words, **self._data)
+        return index
+
+    def vocabulary(self) -> FrozenSet[str]:
+        """
+        Set of words of this dictionary for membership checks, built once on first access and shared by all callers
+        :return: frozenset of words
+        """
+        if self._vocabulary is None:
+            with self._lock:
+                if self._vocabulary is None:
+                    self._vocabulary = frozenset(self.words)
+        return self._vocabulary
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def __getitem__(self, index: int) -> str:
+        return self.words[index]
+
+    def __repr__(self):
+        return f'Dictionary {self.name}: words count={len(self.words)}'
+
+
+ENGINES = {
+    'index': WordIndex,
+    'numpy': MatrixIndex,
+}
+_REGISTRY: Dict[str, Dictionary] = {}
+_LOCK = threading.Lock()
+
+
+def get_dictionary(lang: str) -> Dictionary:
+    """
+    Returns shared dictionary for given lang. Dictionary file is read only once per process, all next calls (from any
+    thread) return the same object
+    :param lang: ru or en for dictionary
+    :return: Dictionary object
+    """
+    dictionary = _REGISTRY.get(lang)
+    if dictionary is None:
+        with _LOCK:
+            dictionary = _REGISTRY.get(lang)
+            if dictionary is None:
+                dictionary = Dictionary(lang, read_data_file(lang))
+                _REGISTRY[lang] = dictionary
+    return dictionary
+
+
+def register_dictionary(name: str, source: Union[str, Path, Iterable[str]], encoding: str = 'utf-8',
+                        cache: bool = True) -> Dictionary:
+    """
+    Registers custom dictionary, so it can be used by Word objects with dictionary=name. Source is a text file with one
+    word per line (empty lines are skipped) or iterable of words, words are lowered like words of bundled dictionaries,
+    as queries of Word are lowered. For a file, dictionary with precomputed data of the
+    search index is cached next to it (in the file with CACHE_SUFFIX added to the name) and the cache is used instead
+    of the file on next runs, while the file is not changed. If the cache can't be written, it is silently skipped
+    :param name: name of the dictionary, registered dictionary with the same name (even bundled) is replaced
+    :param source: path to the text file or iterable of words (strings)
+    :param encoding: encoding of the text file, UTF-8 by default
+    :param cache: use cache of the text file, True by default
+    :return: Dictionary object
+    """
+    if isinstance(source, (str, Path)):
+        dictionary = _read_cached(name, Path(source), encoding) if cache else Dictionary(name, _read(source, encoding))
+    else:
+        dictionary = Dictionary(name, [word.lower() for word in source])
+    with _LOCK:
+        _REGISTRY[name] = dictionary
+    return dictionary
+
+
+def has_dictionary(name: str) -> bool:
+    """
+    Checks if dictionary with given name can be used: it is bundled (ru or en) or registered
+    :param name: name of the dictionary
+    :return: True if dictionary exists
+    """
+    return name in _REGISTRY or name in {str(e.value) for e in Lang}
+
+
+def load_dictionary(path: Union[str, Path]) -> Dictionary:
+    """
+    Loads dictionary from the binary file (see Dictionary.save) and makes it shared dictionary for its name, so Word
+    objects for this lang use it instead of reading the dictionary file. For example, save dictionary once with
+    get_dictionary('ru').save(path) and call load_dictionary(path) on start of the process
+    :param path: path to the file
+    :return: Dictionary object
+    :raises ValueError if file is not a dictionary file, it has unsupported format version or it is corrupted
+    """
+    dictionary = Dictionary.load(path)
+    with _LOCK:
+        _REGISTRY[dictionary.name] = dictionary
+    return dictionary
+
+
+def preload(*langs: str) -> None:
+    """
+    Loads dictionaries for given langs (all bundled dictionaries if no langs given) in advance. Call it in the parent
+    process before forking workers, so all of them will share already loaded words
+    :param langs: ru or en for dictionary
+    :return: None
+    """
+    for lang in langs or [str(e.value) for e in Lang]:
+        get_dictionary(lang)
+
+
+def _read_cached(name: str, path: Path, encoding: str) -> Dictionary:
+    cache = path.with_name(path.name + CACHE_SUFFIX)
+    try:
+        return Dictionary.load(cache, name, path)
+    except (OSError, ValueError):
+        pass
+    dictionary = Dictionary(name, _read(path, encoding))
+    try:
+        dictionary.save(cache, path)
+    except OSError:
+        pass
+    return dictionary
+
+
+def _read(path: Union[str, Path], encoding: str) -> List[str]:
+    return [word.lower() for word in map(str.strip, read_file(path, encoding)) if word]
+
+
+def _stamp(path: Union[str, Path]) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
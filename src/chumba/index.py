@@ -0,0 +1,599 @@
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import groupby, product
+from typing import Any, Dict, Generator, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .conditions import (Condition, LENGTH, LETTER, PREFIX, SUFFIX, CONTAINS, NOT_CONTAINS, ANAGRAM, SUB_ANAGRAM,
+                         SIMILAR, letters_signature)
+from . import profiling
+from .utils import Lang, LRUCache
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # pylint: disable=invalid-name
+
+_MAX_CHAR = chr(0x10FFFF)
+# each letter of all Lang alphabets has own bit, all other symbols share the last bit
+_BITS: Dict[str, int] = {letter: 1 << i for i, letter in enumerate(''.join(e.alphabet for e in Lang))}
+_OTHER_BIT = 1 << 63
+_ALL_BITS = sum(_BITS.values()) | _OTHER_BIT
+RESULTS_CACHE_SIZE = 256
+
+
+def letters_mask(word: str) -> int:
+    """
+    Returns bitmask of letters in word: each letter of Lang alphabets has own bit, all other symbols share one bit.
+    Mask fits into 64-bit unsigned integer
+    :param word: any string
+    :return: bitmask as int
+    """
+    mask = 0
+    for letter in set(word):
+        mask |= _BITS.get(letter, _OTHER_BIT)
+    return mask
+
+
+class _Bucket:
+    """
+    Words of the same length (or all words for length 0) with postings for (position, letter) pairs
+    """
+
+    def __init__(self, words: Sequence[str], ids: List[int]):
+        self.words = words
+        self.ids = ids
+        self._positions: Optional[Dict[Tuple[int, str], Set[int]]] = None
+        self._array: Any = None
+
+    def id_array(self) -> Any:
+        """
+        Returns ids of the bucket as NumPy array, array is created once
+        :return: array of ids
+        """
+        if self._array is None:
+            self._array = numpy.array(self.ids, dtype=numpy.intp)
+        return self._array
+
+    def positions(self) -> Dict[Tuple[int, str], Set[int]]:
+        """
+        Returns sets of ids for each (position, letter) pair of the bucket, sets are created on first call
+        :return: dict of sets of ids
+        """
+        if self._positions is None:
+            positions: Dict[Tuple[int, str], Set[int]] = {}
+            for i in self.ids:
+                for position, letter in enumerate(self.words[i]):
+                    positions.setdefault((position, letter), set()).add(i)
+            self._positions = positions
+        return self._positions
+
+
+class _Sorted:
+    """
+    Ids of words in order of sorted keys (words itself for prefixes or reversed words for suffixes), works as compact
+    trie: all words with given prefix are found with binary search. Keys are not stored (except search of similar
+    words), the object itself is a sequence of sorted keys, taken from words by ids
+    """
+
+    def __init__(self, words: Sequence[str], is_reversed: bool = False, order: Optional[Sequence[int]] = None):
+        if order is None:
+            keys = [word[::-1] for word in words] if is_reversed else words
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.order = order
+        self._words = words
+        self._is_reversed = is_reversed
+        self._keys: Optional[List[str]] = None
+        self._letters = ''
+
+    def starts_with(self, prefix: str) -> Set[int]:
+        """
+        Returns ids of all keys starting with given prefix
+        :param prefix: starting part of the key
+        :return: set of ids
+        """
+        start = bisect_left(self, prefix)
+        end = bisect_left(self, prefix + _MAX_CHAR, start)
+        return set(self.order[start:end])
+
+    def similar_to(self, word: str, distance: int, prefix: str = '', length: int = 0) -> Set[int]:
+        """
+        Returns ids of all keys within given Levenshtein distance from the word. Sorted keys are walked as trie: row of
+        distances for each prefix is computed once for all keys with this prefix, and all keys with a prefix, which is
+        already too far from the word (or too long), are skipped with binary search. For distance up to 1 all edits of
+        the word are looked up instead, if there are less of them than keys. List of sorted keys is created on first
+        call
+        :param word: searched word
+        :param distance: maximal distance
+        :param prefix: only keys starting with prefix are checked
+        :param length: only keys of this length are returned, any length if 0
+        :return: set of ids
+        """
+        keys = self._keys
+        if keys is None:
+            # index is shared between threads: letters are set before keys, so letters are ready once keys are seen
+            keys = [self[i] for i in range(len(self.order))]
+            self._letters = ''.join(sorted(set(''.join(keys))))
+            self._keys = keys
+        letters = self._letters
+        if distance <= 1 and 2 * (len(word) + 1) * len(letters) < len(keys):
+            return self._lookup(_edits(word, letters) if distance else [word], prefix, length)
+        start = bisect_left(keys, prefix)
+        return self._walk(word, distance, start, bisect_left(keys, prefix + _MAX_CHAR, start), length)
+
+    def _walk(self, word: str, distance: int, start: int, end: int, length: int) -> Set[int]:
+        # pylint: disable=too-many-locals
+        keys, order = self._keys, self.order
+        longest = min(length or len(word) + distance, len(word) + distance)
+        found: Set[int] = set()
+        # rows[depth] is the row of distances for the first depth letters of the current key
+        rows = [[min(j, distance + 1) for j in range(len(word) + 1)]]
+        current = ''
+        i = start
+        while i < end:
+            key = keys[i]
+            common = 0
+            while common < len(current) and common < len(key) and current[common] == key[common]:
+                common += 1
+            del rows[common + 1:]
+            skipped = False
+            for depth in range(common, len(key)):
+                if depth == longest:
+                    skipped = True
+                else:
+                    row = _next_row(rows[depth], word, key[depth], depth, distance)
+                    rows.append(row)
+                    skipped = min(row) > distance
+                if skipped:
+                    i = bisect_left(keys, key[:depth + 1] + _MAX_CHAR, i + 1, end)
+                    break
+            current = key[:len(rows) - 1]
+            if not skipped:
+                if rows[-1][-1] <= distance and (not length or len(key) == length):
+                    found.add(order[i])
+                i += 1
+        return found
+
+    def _lookup(self, keys: Iterable[str], prefix: str, length: int) -> Set[int]:
+        found: Set[int] = set()
+        for key in keys:
+            if key.startswith(prefix) and (not length or len(key) == length):
+                i = bisect_left(self._keys, key)
+                while i < len(self.order) and self._keys[i] == key:
+                    found.add(self.order[i])
+                    i += 1
+        return found
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, index: int) -> str:
+        word = self._words[self.order[index]]
+        return word[::-1] if self._is_reversed else word
+
+
+class _Plan:  # pylint: disable=too-many-instance-attributes
+    """
+    Conditions of the Word compiled to the form suitable for the index
+    """
+
+    def __init__(self):
+        self.length: int = 0
+        self.letters: Dict[int, str] = {}
+        self.prefixes: List[str] = []
+        self.suffixes: List[str] = []
+        self.required: int = 0
+        self.forbidden: int = 0
+        self.signature: str = ''
+        self.budget: str = ''
+        self.similar: Optional[Tuple[str, int]] = None
+        self.residual: List[Condition] = []
+        self.impossible: bool = False
+
+    def add(self, condition: Condition) -> None:
+        """
+        Adds condition to the plan. Conditions, which can't be answered by index (contains conditions for symbols
+        without own bit in mask, regular expressions), are checked directly. Letters of sub-anagram are also checked
+        directly, index only narrows candidates for them
+        :param condition: condition of the Word
+        :return: None
+        """
+        kind, value = condition
+        if kind == LENGTH:
+            self.length = value
+        elif kind == LETTER:
+            self.add_letter(*value)
+        elif kind == PREFIX:
+            self.prefixes.append(value)
+        elif kind == SUFFIX:
+            self.suffixes.append(value)
+        elif kind == CONTAINS:
+            self.required |= _BITS.get(value, _OTHER_BIT)
+            if value not in _BITS:
+                self.residual.append(condition)
+        elif kind == NOT_CONTAINS and value in _BITS:
+            self.forbidden |= _BITS[value]
+        elif kind == ANAGRAM:
+            if self.signature and self.signature != value:
+                self.impossible = True
+            self.signature = value
+        elif kind == SUB_ANAGRAM:
+            # letters, which are not given, can't be in the word
+            self.forbidden |= _ALL_BITS & ~letters_mask(value)
+            self.budget = self.budget or value
+            self.residual.append(condition)
+        elif kind == SIMILAR and self.similar is None:
+            self.similar = value
+        else:
+            self.residual.append(condition)
+
+    def add_letter(self, index: int, letter: str) -> None:
+        """
+        Adds condition for letter at index, plan become impossible if there is another letter on same index
+        :param index: index of letter in word
+        :param letter: exactly one letter
+        :return: None
+        """
+        if self.letters.setdefault(index, letter) != letter:
+            self.impossible = True
+
+    def finish(self) -> None:
+        """
+        Finishes the plan: if length is known, prefixes and suffixes become letters at fixed indexes, otherwise letters
+        at the start of the word become prefix (sorted words are searched faster than postings of all words). Length of
+        anagram is length of its letters
+        :return: None
+        """
+        if self.signature:
+            if self.length and self.length != len(self.signature):
+                self.impossible = True
+            self.length = len(self.signature)
+        if not self.length and 0 in self.letters:
+            end = 0
+            while end in self.letters:
+                end += 1
+            self.prefixes.append(''.join(self.letters.pop(index) for index in range(end)))
+        if self.length:
+            for prefix in self.prefixes:
+                for index, letter in enumerate(prefix):
+                    self.add_letter(index, letter)
+            for suffix in self.suffixes:
+                for index, letter in enumerate(suffix, start=self.length - len(suffix)):
+                    self.add_letter(index, letter)
+            self.prefixes, self.suffixes = [], []
+            if any(index < 0 or index >= self.length for index in self.letters):
+                self.impossible = True
+        if self.required & self.forbidden:
+            self.impossible = True
+
+
+class WordIndex:  # pylint: disable=too-many-instance-attributes
+    """
+    Precomputed search structures over a sequence of words: buckets by length, (position, letter) posting sets,
+    letter-presence bitmasks, sorted prefixes (also walked as trie for similar words) and reversed suffixes, groups of
+    words by letters signature (for anagrams and sub-anagrams). All structures except bitmasks are built lazily, on
+    first query which needs them. Bitmasks are stored as compact array of 64-bit integers, checked with one
+    vectorized pass if NumPy is installed. Results of the last RESULTS_CACHE_SIZE different condition sets are cached.
+    For internal use
+    """
+
+    def __init__(self, words: Sequence[str], masks: Any = None, orders: Optional[Tuple[Sequence[int], ...]] = None):
+        """
+        Creates index for given words, ids of the words are their indexes in the sequence. Precomputed data (from
+        masks and orders methods of index for the same words) can be given, so it is not computed again
+        :param words: sequence of words
+        :param masks: letters masks of words (array or buffer of 64-bit unsigned integers), computed if None
+        :param orders: ids of words in order of sorted words and in order of sorted reversed words, computed if None
+        """
+        self.words = words
+        if masks is None:
+            masks = array('Q', (letters_mask(word) for word in words))
+        # without NumPy masks are checked one by one, and list of ints is faster to iterate than array
+        self._masks: Any = masks.tolist() if numpy is None else numpy.frombuffer(masks, dtype=numpy.uint64)
+        self._buckets: Dict[int, _Bucket] = {}
+        self._all: Optional[_Bucket] = None
+        self._prefixes: Optional[_Sorted] = None
+        self._suffixes: Optional[_Sorted] = None
+        self._signatures: Optional[Dict[str, List[int]]] = None
+        self._orders = orders
+        self._results = LRUCache(RESULTS_CACHE_SIZE)
+        self._lock = threading.Lock()
+
+    def masks(self) -> array:
+        """
+        Returns letters masks of words as array of 64-bit unsigned integers
+        :return: array of masks
+        """
+        if numpy is None:
+            return array('Q', self._masks)
+        masks = array('Q')
+        masks.frombytes(self._masks.tobytes())
+        return masks
+
+    def orders(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        Returns ids of words in order of sorted words and in order of sorted reversed words, for prefixes and suffixes
+        :return: pair of sequences of ids
+        """
+        return self._sorted_prefixes().order, self._sorted_suffixes().order
+
+    def select(self, conditions: Iterable[Condition]) -> Sequence[int]:
+        """
+        Returns ids of all words matching all given conditions, in order of words. Order and duplicates of conditions
+        do not matter, results for the same set of conditions are taken from cache
+        :param conditions: iterable of conditions
+        :return: sequence (tuple) of ids
+        """
+        key = frozenset(conditions)
+        results = self._results.get(key)
+        if results is None:
+            profiling.count('index.cache_misses')
+            results = tuple(self._select_plan(self._compile(key)))
+            self._results.put(key, results)
+        else:
+            profiling.count('index.cache_hits')
+        return results
+
+    def narrow(self, selected: Sequence[int], conditions: Sequence[Condition],
+               added: Sequence[Condition]) -> Sequence[int]:
+        """
+        Returns ids of words matching conditions and added conditions, checking only already selected words
+        :param selected: ids of words matching conditions (result of select)
+        :param conditions: conditions for selected ids
+        :param added: new conditions
+        :return: sequence (tuple) of ids
+        """
+        key = frozenset(conditions).union(added)
+        results = self._results.get(key)
+        if results is None:
+            profiling.count('index.cache_misses')
+            words = self.words
+            results = tuple(i for i in selected if all(condition(words[i]) for condition in added))
+            self._results.put(key, results)
+            profiling.count('index.scanned', len(selected))
+            profiling.count('index.matched', len(results))
+        else:
+            profiling.count('index.cache_hits')
+        return results
+
+    def iter_select(self, conditions: Iterable[Condition]) -> Generator[int, None, Sequence[int]]:
+        """
+        Lazy variant of select: candidates are found by posting sets and masks on first step of the iteration, other
+        conditions are checked while ids are taken, so iteration can be stopped early. Results are cached only when
+        iteration is finished, they are the return value of the generator
+        :param conditions: iterable of conditions
+        :return: generator of ids in order of words
+        """
+        key = frozenset(conditions)
+        return self._iter_results(key, None, key)
+
+    def iter_narrow(self, selected: Sequence[int], conditions: Sequence[Condition],
+                    added: Sequence[Condition]) -> Generator[int, None, Sequence[int]]:
+        """
+        Lazy variant of narrow, see iter_select
+        :param selected: ids of words matching conditions (result of select)
+        :param conditions: conditions for selected ids
+        :param added: new conditions
+        :return: generator of ids in order of words
+        """
+        key = frozenset(conditions).union(added)
+        return self._iter_results(key, selected, tuple(added))
+
+    def select_many(self, condition_sets: Iterable[Iterable[Condition]]) -> List[Sequence[int]]:
+        """
+        Returns ids of matching words for each of given sets of conditions, in same order as sets. Sets are evaluated
+        grouped by length and intersections of posting sets are shared between sets with same letters at same indexes
+        :param condition_sets: iterable of iterables of conditions
+        :return: list of sequences (tuples) of ids
+        """
+        keys = [frozenset(conditions) for conditions in condition_sets]
+        results: List[Optional[Sequence[int]]] = [self._results.get(key) for key in keys]
+        plans = {i: self._compile(key) for i, key in enumerate(keys) if results[i] is None}
+        profiling.count('index.cache_hits', len(keys) - len(plans))
+        profiling.count('index.cache_misses', len(plans))
+        memo: Dict[Tuple, Set[int]] = {}
+        for i in sorted(plans, key=lambda e: plans[e].length):
+            results[i] = tuple(self._select_plan(plans[i], memo))
+            self._results.put(keys[i], results[i])
+        return results  # type: ignore
+
+    def _iter_results(self, key: frozenset, selected: Optional[Sequence[int]],
+                      conditions: Iterable[Condition]) -> Generator[int, None, Sequence[int]]:
+        results = self._results.get(key)
+        if results is not None:
+            profiling.count('index.cache_hits')
+            yield from results
+            return results
+        profiling.count('index.cache_misses')
+        if selected is None:
+            plan = self._compile(conditions)
+            candidates, residual = self._candidates(plan), plan.residual
+        else:
+            candidates, residual = selected, list(conditions)
+            profiling.count('index.scanned', len(selected))
+        words, found = self.words, []
+        for i in candidates:
+            if all(condition(words[i]) for condition in residual):
+                found.append(i)
+                yield i
+        results = tuple(found)
+        self._results.put(key, results)
+        profiling.count('index.matched', len(results))
+        return results
+
+    def _select_plan(self, plan: _Plan, memo: Optional[Dict[Tuple, Set[int]]] = None) -> List[int]:
+        return self._check_residual(self._candidates(plan, memo), plan)
+
+    def _candidates(self, plan: _Plan, memo: Optional[Dict[Tuple, Set[int]]] = None) -> List[int]:
+        # ids of words matching conditions of posting sets and masks, other conditions are checked later
+        if plan.impossible:
+            return []
+        bucket = self._bucket(plan.length)
+        postings = self._postings(plan, bucket, memo)
+        if postings:
+            postings.sort(key=len)
+            candidates = sorted(postings[0].intersection(*postings[1:]))
+        else:
+            candidates = bucket.ids
+        profiling.count('index.scanned', len(candidates))
+        if plan.required or plan.forbidden:
+            candidates = self._filter_masks(candidates, bucket, plan)
+        return candidates
+
+    def _check_residual(self, candidates: List[int], plan: _Plan) -> List[int]:
+        if plan.residual:
+            words, residual = self.words, plan.residual
+            candidates = [i for i in candidates if all(condition(words[i]) for condition in residual)]
+        profiling.count('index.matched', len(candidates))
+        return candidates
+
+    def _filter_masks(self, candidates: List[int], bucket: _Bucket, plan: _Plan) -> List[int]:
+        if numpy is None:
+            masks, required, forbidden = self._masks, plan.required, plan.forbidden
+            return [i for i in candidates if masks[i] & required == required and not masks[i] & forbidden]
+        ids = bucket.id_array() if candidates is bucket.ids else numpy.array(candidates, dtype=numpy.intp)
+        return ids[self._keep_masks(ids, plan)].tolist()
+
+    def _keep_masks(self, ids: Any, plan: _Plan) -> Any:
+        masks = self._masks[ids]
+        keep = (masks & numpy.uint64(plan.required)) == numpy.uint64(plan.required)
+        if plan.forbidden:
+            keep &= (masks & numpy.uint64(plan.forbidden)) == 0
+        return keep
+
+    def _compile(self, conditions: Iterable[Condition]) -> _Plan:
+        plan = _Plan()
+        for condition in conditions:
+            plan.add(condition)
+        plan.finish()
+        return plan
+
+    def _postings(self, plan: _Plan, bucket: _Bucket, memo: Optional[Dict[Tuple, Set[int]]] = None) -> List[Set[int]]:
+        positions = bucket.positions() if plan.letters else {}
+        if memo is None or not plan.letters:
+            postings = [positions.get(item, set()) for item in plan.letters.items()]
+        else:
+            postings = [self._shared_intersection(plan, positions, memo)]
+        if plan.prefixes:
+            postings.extend(self._sorted_prefixes().starts_with(prefix) for prefix in plan.prefixes)
+        if plan.suffixes:
+            postings.extend(self._sorted_suffixes().starts_with(suffix[::-1]) for suffix in plan.suffixes)
+        if plan.signature:
+            postings.append(set(self._signature_groups().get(plan.signature, ())))
+        if plan.budget:
+            found = self._sub_anagrams(plan.budget, plan.length)
+            if found is not None:
+                postings.append(found)
+        if plan.similar:
+            postings.append(self._similar(plan))
+        return postings
+
+    def _similar(self, plan: _Plan) -> Set[int]:
+        # known start of the word (prefix or letters from index 0) limits the walk over sorted words
+        end = 0
+        while end in plan.letters:
+            end += 1
+        prefix = max([''.join(plan.letters[i] for i in range(end))] + plan.prefixes, key=len)
+        word, distance = plan.similar  # type: ignore
+        return self._sorted_prefixes().similar_to(word, distance, prefix, plan.length)
+
+    def _sub_anagrams(self, letters: str, length: int) -> Optional[Set[int]]:
+        groups = self._signature_groups()
+        counts = [(letter, len(list(same))) for letter, same in groupby(letters)]
+        variants = 1
+        for _, count in counts:
+            variants *= count + 1
+            # signatures of parts of letters are looked up only if there are less of them than signatures of words,
+            # otherwise words are checked by masks and letters counts
+            if variants > len(groups):
+                return None
+        found: Set[int] = set()
+        for signature in _sub_signatures(counts, length):
+            found.update(groups.get(signature, ()))
+        return found
+
+    @staticmethod
+    def _shared_intersection(plan: _Plan, positions: Dict[Tuple[int, str], Set[int]],
+                             memo: Dict[Tuple, Set[int]]) -> Set[int]:
+        items = sorted(plan.letters.items())
+        current: Set[int] = set()
+        for k, item in enumerate(items, start=1):
+            key = (plan.length, tuple(items[:k]))
+            shared = memo.get(key)
+            if shared is None:
+                posting = positions.get(item, set())
+                shared = memo[key] = posting if k == 1 else current & posting
+            current = shared
+        return current
+
+    def _bucket(self, length: int) -> _Bucket:
+        if not length:
+            # bucket of all words does not need grouping by length, so it is created separately
+            if self._all is None:
+                with self._lock:
+                    if self._all is None:
+                        self._all = _Bucket(self.words, list(range(len(self.words))))
+            return self._all
+        if not self._buckets:
+            with self._lock:
+                if not self._buckets:
+                    by_length: Dict[int, List[int]] = {}
+                    for i, word in enumerate(self.words):
+                        by_length.setdefault(len(word), []).append(i)
+                    self._buckets = {key: _Bucket(self.words, ids) for key, ids in by_length.items()}
+        return self._buckets.get(length) or _Bucket(self.words, [])
+
+    def _signature_groups(self) -> Dict[str, List[int]]:
+        if self._signatures is None:
+            with self._lock:
+                if self._signatures is None:
+                    signatures: Dict[str, List[int]] = {}
+                    for i, word in enumerate(self.words):
+                        signatures.setdefault(letters_signature(word), []).append(i)
+                    self._signatures = signatures
+        return self._signatures
+
+    def _sorted_prefixes(self) -> _Sorted:
+        if self._prefixes is None:
+            with self._lock:
+                if self._prefixes is None:
+                    self._prefixes = _Sorted(self.words, order=self._orders and self._orders[0])
+        return self._prefixes
+
+    def _sorted_suffixes(self) -> _Sorted:
+        if self._suffixes is None:
+            with self._lock:
+                if self._suffixes is None:
+                    self._suffixes = _Sorted(self.words, True, self._orders and self._orders[1])
+        return self._suffixes
+
+
+def _sub_signatures(counts: List[Tuple[str, int]], length: int) -> Iterator[str]:
+    # each part of the multiset of letters takes from 0 to count of each letter, letters stay sorted
+    for parts in product(*([letter * k for k in range(count + 1)] for letter, count in counts)):
+        signature = ''.join(parts)
+        if signature and (not length or len(signature) == length):
+            yield signature
+
+
+def _next_row(above: List[int], word: str, letter: str, depth: int, distance: int) -> List[int]:
+    # row of Levenshtein distances for the key prefix longer by one letter than prefix of the above row, only cells
+    # near the diagonal can be within distance, all other cells (and all bigger distances) are distance + 1
+    limit = distance + 1
+    row = [limit] * len(above)
+    row[0] = min(depth + 1, limit)
+    for j in range(max(1, depth + 1 - distance), min(len(word), depth + 1 + distance) + 1):
+        row[j] = min(row[j - 1] + 1, above[j] + 1, above[j - 1] + (letter != word[j - 1]), limit)
+    return row
+
+
+def _edits(word: str, letters: str) -> Set[str]:
+    # all strings within distance 1 from the word: the word itself, deleted, replaced and inserted letters
+    edits = {word}
+    for i in range(len(word) + 1):
+        head, tail = word[:i], word[i:]
+        edits.update(head + letter + tail for letter in letters)
+        if tail:
+            edits.add(head + tail[1:])
+            edits.update(head + letter + tail[1:] for letter in letters)
+    return edits
@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import profiling
+from .index import WordIndex, numpy, _Plan
+
+
+class MatrixIndex(WordIndex):
+    """
+    NumPy variant of the WordIndex. Each length bucket is stored as 2D matrix of letter code points (one row per word),
+    words of any length are stored as matrices of words and reversed words, padded with zeros. Letters at indexes,
+    prefixes and suffixes are checked as comparisons of matrix columns for the whole bucket at once. Gives the same
+    results as WordIndex. Anagrams and similar words are found like in WordIndex. For internal use
+    """
+
+    def __init__(self, words: Sequence[str], masks: Any = None, orders: Optional[Tuple[Sequence[int], ...]] = None):
+        """
+        Creates index for given words, ids of the words are their indexes in the sequence
+        :param words: sequence of words
+        :param masks: precomputed letters masks of words, see WordIndex
+        :param orders: precomputed orders of sorted words and sorted reversed words, see WordIndex
+        :raises ImportError if NumPy is not installed
+        """
+        if numpy is None:
+            raise ImportError('NumPy is required for numpy engine, install it with "pip install chumba[numpy]"')
+        super().__init__(words, masks, orders)
+        self._matrices: Dict[Tuple[int, bool], Any] = {}
+
+    def _candidates(self, plan: _Plan, memo: Optional[Dict[Tuple, Set[int]]] = None) -> List[int]:
+        if plan.impossible:
+            return []
+        if plan.signature or plan.budget or plan.similar:
+            return super()._candidates(plan, memo)
+        bucket = self._bucket(plan.length)
+        ids = bucket.id_array()
+        checks = [(self._matrix(plan.length), index, letter) for index, letter in plan.letters.items()]
+        for prefix in plan.prefixes:
+            checks.extend((self._matrix(0), index, letter) for index, letter in enumerate(prefix))
+        for suffix in plan.suffixes:
+            checks.extend((self._matrix(0, True), index, letter) for index, letter in enumerate(reversed(suffix)))
+        keep = self._keep_masks(ids, plan) if plan.required or plan.forbidden else numpy.ones(len(ids), dtype=bool)
+        for matrix, index, letter in checks:
+            if index >= matrix.shape[1]:
+                return []
+            keep &= matrix[:, index] == ord(letter)
+        profiling.count('index.scanned', len(ids))
+        return ids[keep].tolist()
+
+    def _matrix(self, length: int, is_reversed: bool = False) -> Any:
+        matrix = self._matrices.get((length, is_reversed))
+        if matrix is None:
+            words = [self.words[i] for i in self._bucket(length).ids]
+            if is_reversed:
+                words = [word[::-1] for word in words]
+            width = max(map(len, words), default=0) or 1
+            matrix = numpy.array(words, dtype=f'<U{width}').view(numpy.uint32).reshape(len(words), width)
+            self._matrices[(length, is_reversed)] = matrix
+        return matrix
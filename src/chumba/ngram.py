@@ -0,0 +1,169 @@
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .sketch import CountMinSketch, SpaceSaving
+from .tokenizer import IGNORED, Tokenizer
+from .utils import from_generator
+
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+class NgramStatistics:  # pylint: disable=too-many-instance-attributes
+    """
+    Statistics of n-grams (sequences of n consecutive words) of texts. Words are lowered and parsed like in Statistics.
+    Each word is interned to integer id and each n-gram is kept as one integer, packed from ids of its words.
+    N-grams are counted exactly by default. With capacity they are counted approximately in fixed memory: the most
+    common n-grams are kept by Space-Saving top-k (not more than capacity n-grams) and counts of any n-grams are
+    estimated by Count-Min sketch, so approximate counts are never smaller than real ones
+    """
+
+    def __init__(self, content: str = '', n: int = 2, ignored=IGNORED, tokenizer: Optional[Tokenizer] = None,
+                 capacity: int = 0):
+        """
+        Creates n-gram statistic object for given text
+        :param content: string representation of some text, more texts can be added with update
+        :param n: number of words in n-gram, 2 for bigrams, 3 for trigrams
+        :param ignored: sequence for ignore words, for string each symbol is a word
+        :param tokenizer: tokenizer for custom rules of parsing words, ignored argument is not used if it is given
+        :param capacity: if it is bigger than zero, then n-grams are counted approximately and not more than capacity
+        most common n-grams are kept
+        :raises ValueError if n is less than 1
+        """
+        if n < 1:
+            raise ValueError(f'N should be positive, got {n}')
+        self.n = n
+        self.grams_count = 0
+        self.counter: Counter = Counter()
+        self._tokenizer = tokenizer or Tokenizer(ignored=ignored)
+        self._ids: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._top: Optional[SpaceSaving] = SpaceSaving(capacity) if capacity > 0 else None
+        self._sketch: Optional[CountMinSketch] = CountMinSketch(4 * capacity) if capacity > 0 else None
+        self.update(content)
+
+    @property
+    def is_approximate(self) -> bool:
+        """
+        Are n-grams counted approximately (with capacity)
+        """
+        return self._top is not None
+
+    def update(self, content: str) -> None:
+        """
+        Adds n-grams of one more text, n-grams do not cross the border between texts
+        :param content: string representation of some text
+        :return: None
+        """
+        grams = Counter(self._grams(self._intern(self._tokenizer.lowered_words(content))))
+        self.grams_count += sum(grams.values())
+        if self._top is None:
+            self.counter.update(grams)
+            return
+        for gram, count in grams.items():
+            self._top.add(gram, count)
+            self._sketch.add(gram, count)
+
+    def count(self, *words: str) -> int:
+        """
+        Returns how many times n-gram of given words appears in texts, words are lowered. For approximate statistics
+        count is never smaller than the real one
+        :param words: words of n-gram
+        :return: count
+        :raises ValueError if number of words is wrong
+        """
+        gram = self._pack(words)
+        if gram is None:
+            return 0
+        if self._top is None:
+            return self.counter[gram]
+        estimate = self._sketch.estimate(gram)
+        return min(estimate, self._top.counts.get(gram, estimate))
+
+    def most_common(self, limit: int = 0) -> List[Tuple[Tuple[str, ...], int]]:
+        """
+        Returns list of pairs of most common n-grams and their counts, like [(('word', 'other'), count)].
+        For approximate statistics only kept n-grams are returned, their counts may be bigger than real ones not more
+        than on max_error
+        :param limit: how many n-grams should be in result, if it is less or equal zero - all results will be return
+        :return: list of pairs n-gram-count
+        """
+        pairs = self.counter.most_common() if self._top is None else self._top.most_common()
+        return from_generator(((self._unpack(gram), count) for gram, count in pairs), limit)
+
+    def max_error(self) -> int:
+        """
+        Returns maximal difference between count of n-gram from most_common and its real count, 0 for exact statistics
+        :return: number
+        """
+        return 0 if self._top is None else self._top.minimum()
+
+    def _grams(self, ids: List[int]) -> List[int]:
+        grams = ids
+        for shift in range(1, self.n):
+            grams = [(gram << _ID_BITS) | i for gram, i in zip(grams, ids[shift:])]
+        return grams
+
+    def _intern(self, words: List[str]) -> List[int]:
+        ids, known = self._ids, self._words
+        result = []
+        for word in words:
+            i = ids.get(word)
+            if i is None:
+                i = ids[word] = len(known)
+                known.append(word)
+            result.append(i)
+        return result
+
+    def _pack(self, words: Tuple[str, ...]) -> Optional[int]:
+        if len(words) != self.n:
+            raise ValueError(f'Number of words should be {self.n}, got {len(words)}')
+        ids = [self._ids.get(word.lower()) for word in words]
+        grams = [] if None in ids else self._grams(ids)
+        return grams[0] if grams else None
+
+    def _unpack(self, gram: int) -> Tuple[str, ...]:
+        words = []
+        for _ in range(self.n):
+            words.append(self._words[gram & _ID_MASK])
+            gram >>= _ID_BITS
+        return tuple(reversed(words))
+
+    def __repr__(self):
+        return f'{self.n}-gram statistic: n-grams count={self.grams_count}, 3 most common={self.most_common(3)}'
+
+
+class CooccurrenceStatistics(NgramStatistics):
+    """
+    Statistics of co-occurrences of words: pairs of different words, which appear together in a window of consecutive
+    words. Pair is not ordered, ('a', 'b') and ('b', 'a') is the same pair, words of pairs are sorted by appearance in
+    texts. Counting is the same as for NgramStatistics, exact or approximate with capacity
+    """
+
+    def __init__(self, content: str = '', window: int = 2, ignored=IGNORED, tokenizer: Optional[Tokenizer] = None,
+                 capacity: int = 0):
+        """
+        Creates co-occurrence statistic object for given text
+        :param content: string representation of some text, more texts can be added with update
+        :param window: number of consecutive words, in which each pair of words is counted, 2 for neighbours
+        :param ignored: sequence for ignore words, for string each symbol is a word
+        :param tokenizer: tokenizer for custom rules of parsing words, ignored argument is not used if it is given
+        :param capacity: if it is bigger than zero, then pairs are counted approximately and not more than capacity
+        most common pairs are kept
+        :raises ValueError if window is less than 2
+        """
+        if window < 2:
+            raise ValueError(f'Window should be at least 2, got {window}')
+        self.window = window
+        super().__init__(content, 2, ignored, tokenizer, capacity)
+
+    def _grams(self, ids: List[int]) -> List[int]:
+        grams = []
+        for shift in range(1, self.window):
+            grams.extend((min(first, second) << _ID_BITS) | max(first, second)
+                         for first, second in zip(ids, ids[shift:]) if first != second)
+        return grams
+
+    def __repr__(self):
+        return f'Co-occurrence statistic: window={self.window}, pairs count={self.grams_count}, ' \
+               f'3 most common={self.most_common(3)}'
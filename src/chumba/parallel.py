@@ -0,0 +1,72 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .statistic import Statistics
+
+SHARD_SIZE = 1 << 20
+_SPACE = re.compile(r'\s')
+
+
+def statistics_from_files(paths: Iterable[Union[str, Path]], processes: Optional[int] = None,
+                          ignored='-1234567890', encoding='utf-8') -> Statistics:
+    """
+    Creates one statistic object for all given text files. Files are read and counted in parallel by a pool of
+    processes, then partial results are merged in order of files. Result is the same as for Statistics over
+    concatenated texts of files, except words attribute, which is None
+    :param paths: paths to the text files
+    :param processes: number of processes, number of CPUs by default
+    :param ignored: sequence for ignore words
+    :param encoding: encoding of files, UTF-8 by default
+    :return: Statistics object
+    """
+    tasks = [(path, ignored, encoding) for path in paths]
+    return _merge(_run(_count_file, tasks, processes))
+
+
+def statistics_from_texts(texts: Iterable[str], processes: Optional[int] = None, ignored='-1234567890') -> Statistics:
+    """
+    Creates one statistic object for all given texts. Big texts are split to shards (by SHARD_SIZE characters, on the
+    borders of words), shards are counted in parallel by a pool of processes, then partial results are merged in order
+    of texts. Result is the same as for Statistics over concatenated texts, except words attribute, which is None
+    :param texts: iterable of texts (strings)
+    :param processes: number of processes, number of CPUs by default
+    :param ignored: sequence for ignore words
+    :return: Statistics object
+    """
+    tasks = [(shard, ignored) for text in texts for shard in _shards(text)]
+    return _merge(_run(_count_text, tasks, processes))
+
+
+def _run(function: Callable[[tuple], Statistics], tasks: List[tuple], processes: Optional[int]) -> List[Statistics]:
+    if len(tasks) <= 1 or processes == 1:
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(function, tasks))
+
+
+def _merge(stats: List[Statistics]) -> Statistics:
+    if not stats:
+        return Statistics('', keep_words=False)
+    return stats[0].merge(*stats[1:])
+
+
+def _count_file(task: Tuple[Union[str, Path], str, str]) -> Statistics:
+    path, ignored, encoding = task
+    return Statistics.from_stream(path, ignored, encoding)
+
+
+def _count_text(task: Tuple[str, str]) -> Statistics:
+    text, ignored = task
+    return Statistics.from_stream([text], ignored)
+
+
+def _shards(text: str) -> Iterator[str]:
+    start = 0
+    while len(text) - start > SHARD_SIZE:
+        space = _SPACE.search(text, start + SHARD_SIZE)
+        end = space.start() if space else len(text)
+        yield text[start:end]
+        start = end
+    yield text[start:]
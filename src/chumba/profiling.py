@@ -0,0 +1,196 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+class Profile:
+    """
+    Collected timers and counters of instrumented phases. Timer keeps number of calls, total and maximal time of the
+    phase (in seconds), counter keeps the sum of counted values. Profile is thread-safe.
+    Timers: dictionary.read (reading of bundled dictionary file), word.select (search of Word results), statistics.count
+    (tokenization and counting of texts). Counters: dictionary.words (read words), index.scanned and index.matched
+    (words checked by the index and words matched all conditions), index.cache_hits and index.cache_misses (results
+    cache of the index), word.snapshot_hits (results of Word reused without search), statistics.words (counted words)
+    """
+
+    def __init__(self):
+        self._timers: Dict[str, List[float]] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Adds one call of the phase with given duration
+        :param name: name of the phase
+        :param seconds: duration of the call
+        :return: None
+        """
+        with self._lock:
+            phase = self._timers.get(name)
+            if phase is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                phase[0] += 1
+                phase[1] += seconds
+                phase[2] = max(phase[2], seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Adds value to the counter
+        :param name: name of the counter
+        :param value: value to add, 1 by default
+        :return: None
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns copy of collected data as plain dict (can be serialized to JSON), like
+        {'timers': {'word.select': {'calls': 2, 'total': 0.01, 'max': 0.008}}, 'counters': {'index.scanned': 120}}
+        :return: dict with timers and counters
+        """
+        with self._lock:
+            timers = {name: {'calls': int(calls), 'total': total, 'max': most}
+                      for name, (calls, total, most) in self._timers.items()}
+            return {'timers': timers, 'counters': dict(self._counters)}
+
+    def reset(self) -> None:
+        """
+        Removes all collected data
+        :return: None
+        """
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def __repr__(self):
+        return f'Profile: timers={len(self._timers)}, counters={len(self._counters)}'
+
+
+class _Timer:
+    __slots__ = ('name', 'profiles', 'start')
+
+    def __init__(self, name: str, profiles: Sequence[Profile]):
+        self.name = name
+        self.profiles = profiles
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        seconds = time.perf_counter() - self.start
+        for collected in self.profiles:
+            collected.add_time(self.name, seconds)
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return None
+
+
+_NO_TIMER = _NoTimer()
+_PROCESS: Optional[Profile] = None
+_CURRENT: ContextVar = ContextVar('chumba_profile', default=None)
+
+
+def enable() -> Profile:
+    """
+    Enables collecting of timers and counters for the whole process (collecting is disabled by default). Collected
+    data is kept until disable or reset
+    :return: Profile object of the process
+    """
+    global _PROCESS  # pylint: disable=global-statement
+    if _PROCESS is None:
+        _PROCESS = Profile()
+    return _PROCESS
+
+
+def disable() -> None:
+    """
+    Disables collecting for the whole process, collected data is dropped. Profiles of profile calls are not affected
+    :return: None
+    """
+    global _PROCESS  # pylint: disable=global-statement
+    _PROCESS = None
+
+
+def is_enabled() -> bool:
+    """
+    Checks if collecting is enabled for the process or for current call (inside profile block)
+    :return: True if enabled
+    """
+    return _PROCESS is not None or _CURRENT.get() is not None
+
+
+def snapshot() -> Dict[str, Any]:
+    """
+    Returns snapshot of data collected for the process, see Profile.snapshot. Empty if collecting is disabled
+    :return: dict with timers and counters
+    """
+    return _PROCESS.snapshot() if _PROCESS is not None else {'timers': {}, 'counters': {}}
+
+
+def reset() -> None:
+    """
+    Removes data collected for the process, collecting stays enabled
+    :return: None
+    """
+    if _PROCESS is not None:
+        _PROCESS.reset()
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """
+    Collects timers and counters of calls inside the block (in current thread or asyncio task) to new Profile object,
+    independently of collecting for the process. For example:
+        with profile() as result:
+            Word(5).examples()
+        print(result.snapshot())
+    :return: Profile object for the block
+    """
+    collected = Profile()
+    token = _CURRENT.set(collected)
+    try:
+        yield collected
+    finally:
+        _CURRENT.reset(token)
+
+
+def timer(name: str) -> Any:
+    """
+    Returns context manager, which adds duration of the block to the timer of the phase, if collecting is enabled.
+    If it is disabled, shared empty context manager is returned. For internal use
+    :param name: name of the phase
+    :return: context manager
+    """
+    profiles = _active()
+    return _Timer(name, profiles) if profiles else _NO_TIMER
+
+
+def count(name: str, value: int = 1) -> None:
+    """
+    Adds value to the counter, if collecting is enabled. For internal use
+    :param name: name of the counter
+    :param value: value to add, 1 by default
+    :return: None
+    """
+    for collected in _active():
+        collected.count(name, value)
+
+
+def _active() -> Sequence[Profile]:
+    current = _CURRENT.get()
+    if current is None:
+        return () if _PROCESS is None else (_PROCESS,)
+    return (current,) if _PROCESS is None else (current, _PROCESS)
@@ -0,0 +1,271 @@
+import heapq
+import itertools
+import math
+import random
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 64) - 1
+
+
+class CountMinSketch:
+    """
+    Approximate counter of keys in fixed memory: depth rows of width counters, each key is counted in one counter of
+    each row (chosen by hash of the key), count of the key is the minimum of its counters. Count is never smaller than
+    the real one and with probability 1 - delta is bigger not more than on epsilon * total, where
+    epsilon = e / width and delta = exp(-depth). Keys are hashed with hash(), so integer keys give the same counters in
+    any process
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, seed: int = 0):
+        """
+        Creates empty sketch
+        :param width: number of counters in each row
+        :param depth: number of rows
+        :param seed: seed for hash functions of rows
+        :raises ValueError if width or depth is less than 1
+        """
+        if width < 1 or depth < 1:
+            raise ValueError(f'Width and depth should be positive, got {width} and {depth}')
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        rand = random.Random(seed)
+        self._hash = (rand.randrange(1, _PRIME), rand.randrange(_PRIME))
+        self._rows = [[0] * width for _ in range(depth)]
+
+    @property
+    def epsilon(self) -> float:
+        """
+        Relative error of counts: count is bigger than the real one not more than on epsilon * total (with
+        probability 1 - delta)
+        """
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        """
+        Probability, that error of count is bigger than epsilon * total
+        """
+        return math.exp(-self.depth)
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        """
+        Adds count to the key
+        :param key: any hashable key
+        :param count: positive number to add
+        :return: None
+        """
+        self.total += count
+        width = self.width
+        for row, position in zip(self._rows, self._positions(key)):
+            row[position % width] += count
+
+    def estimate(self, key: Hashable) -> int:
+        """
+        Returns approximate count of the key, it is never smaller than the real count
+        :param key: any hashable key
+        :return: count
+        """
+        width = self.width
+        return min(row[position % width] for row, position in zip(self._rows, self._positions(key)))
+
+    def _positions(self, key: Hashable) -> range:
+        # one universal hash of the key gives start and step, position in each row is the next step modulo width
+        first, second = self._hash
+        value = (first * hash(key) + second) % _PRIME
+        step = (value >> 32) | 1
+        start = value & 0xFFFFFFFF
+        return range(start, start + step * self.depth, step)
+
+
+class SpaceSaving:
+    """
+    Top-k of the most frequent keys in fixed memory (Space-Saving algorithm): not more than capacity keys are counted,
+    new key replaces the key with the minimal count and takes its count as the error. Count of each kept key is not
+    smaller than the real one and bigger not more than on its error, any key with real count bigger than
+    total / capacity is always kept
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Creates empty summary
+        :param capacity: maximal number of counted keys
+        :raises ValueError if capacity is less than 1
+        """
+        if capacity < 1:
+            raise ValueError(f'Capacity should be positive, got {capacity}')
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._order = itertools.count()
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        """
+        Adds count to the key, if there is no place for the new key, then the key with minimal count is replaced
+        :param key: any hashable key
+        :param count: positive number to add
+        :return: None
+        """
+        self.total += count
+        counts = self.counts
+        if key in counts:
+            counts[key] += count
+        elif len(counts) < self.capacity:
+            counts[key] = count
+            self.errors[key] = 0
+        else:
+            minimum = self._pop_minimum()
+            counts[key] = minimum + count
+            self.errors[key] = minimum
+        heapq.heappush(self._heap, (counts[key], next(self._order), key))
+        if len(self._heap) > 2 * self.capacity + 16:
+            self._heap = [(value, next(self._order), key) for key, value in counts.items()]
+            heapq.heapify(self._heap)
+
+    def most_common(self, limit: int = 0) -> List[Tuple[Hashable, int]]:
+        """
+        Returns list of pairs key-count from the most common to the less common, like Counter.most_common
+        :param limit: how many keys should be in result, if it is less or equal zero - all kept keys
+        :return: list of pairs
+        """
+        if limit > 0:
+            return heapq.nlargest(limit, self.counts.items(), key=lambda e: e[1])
+        return sorted(self.counts.items(), key=lambda e: e[1], reverse=True)
+
+    def minimum(self) -> int:
+        """
+        Returns minimal count of kept keys, if all places are taken, or 0 otherwise. Real count of any key, which is not
+        kept, is not bigger than this number
+        :return: count
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        heap, counts = self._heap, self.counts
+        while counts.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0]
+
+    def _pop_minimum(self) -> int:
+        minimum = self.minimum()
+        key = heapq.heappop(self._heap)[2]
+        del self.counts[key]
+        del self.errors[key]
+        return minimum
+
+
+class HyperLogLog:
+    """
+    Approximate counter of unique keys in fixed memory (HyperLogLog algorithm): 2 ** precision registers of one byte,
+    relative standard error of the count is 1.04 / sqrt(2 ** precision), about 1.6% for default precision. Keys are
+    hashed with hash()
+    """
+
+    def __init__(self, precision: int = 12):
+        """
+        Creates empty counter
+        :param precision: number of bits of hash for index of register, from 4 to 18
+        :raises ValueError if precision is out of range
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f'Precision should be in range (4, 18), got {precision}')
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    @property
+    def error(self) -> float:
+        """
+        Relative standard error of the count
+        """
+        return 1.04 / math.sqrt(len(self._registers))
+
+    def add(self, key: Hashable) -> None:
+        """
+        Adds key to the counter
+        :param key: any hashable key
+        :return: None
+        """
+        value = _mix(hash(key))
+        rest_bits = 64 - self.precision
+        index = value >> rest_bits
+        rank = rest_bits - (value & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        """
+        Returns approximate number of unique added keys
+        :return: count
+        """
+        size = len(self._registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -e for e in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+
+class BloomFilter:
+    """
+    Approximate set of keys in fixed memory: each key sets hashes bits of the bit array (chosen by hash of the key),
+    key is in the set if all its bits are set. Added keys are always found, other keys are found by mistake with
+    probability about error, while number of added keys is not bigger than capacity. Keys are hashed with hash(), so
+    filter of strings is valid only in the process, where it is created
+    """
+
+    def __init__(self, capacity: int, error: float = 0.01):
+        """
+        Creates empty filter with optimal size and number of hashes for given capacity and error
+        :param capacity: expected number of keys
+        :param error: probability of false positive result, from 0 to 1
+        :raises ValueError if capacity is less than 1 or error is not between 0 and 1
+        """
+        if capacity < 1 or not 0 < error < 1:
+            raise ValueError(f'Capacity should be positive and error between 0 and 1, got {capacity} and {error}')
+        self.size = max(8, math.ceil(-capacity * math.log(error) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[Hashable], capacity: int, error: float = 0.01) -> 'BloomFilter':
+        """
+        Creates filter with all given keys
+        :param keys: iterable of hashable keys
+        :param capacity: expected number of keys
+        :param error: probability of false positive result, from 0 to 1
+        :return: BloomFilter object
+        :raises ValueError if capacity is less than 1 or error is not between 0 and 1
+        """
+        bloom = cls(capacity, error)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def add(self, key: Hashable) -> None:
+        """
+        Adds key to the filter
+        :param key: any hashable key
+        :return: None
+        """
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: Hashable) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def _positions(self, key: Hashable) -> Iterable[int]:
+        # double hashing: one mixed hash gives start and step of all positions
+        value = _mix(hash(key))
+        start, step, size = value & 0xFFFFFFFF, (value >> 32) | 1, self.size
+        return ((start + i * step) % size for i in range(self.hashes))
+
+
+def _mix(value: int) -> int:
+    # finalizer of splitmix64, spreads bits of hash (hashes of small integers are the integers themselves)
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
@@ -1,24 +1,190 @@
-import re
-from collections import Counter
-from typing import List, Tuple
+import time
+from array import array
+from bisect import insort
+from collections import Counter, deque
+from functools import partial
+from itertools import chain, compress
+from pathlib import Path
+from typing import (Collection, Container, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO,
+                    Tuple, Union)
 
+from . import profiling
+from .dictionary import Dictionary, get_dictionary, has_dictionary
+from .sketch import BloomFilter, HyperLogLog, SpaceSaving
+from .storage import read_sections, to_array, write_sections
+from .tokenizer import IGNORED, Tokenizer
 from .utils import from_generator
 
+_STATISTICS = 'stats'
+
+
+class Coverage(NamedTuple):
+    """
+    Result of Statistics.coverage: known and unknown words of the text with their counts (most common first) and
+    numbers of known and unknown words in the text (with repeats)
+    """
+    known: List[Tuple[str, int]]
+    unknown: List[Tuple[str, int]]
+    known_count: int
+    unknown_count: int
+
+    @property
+    def ratio(self) -> float:
+        """
+        Part of known words in the text (with repeats), from 0 to 1, 0 for empty text
+        """
+        total = self.known_count + self.unknown_count
+        return self.known_count / total if total else 0.0
+
+
+class _FrequencyIndex:
+    """
+    Words of the counter grouped by count and by length, each group keeps order of the counter. Index is changed
+    together with the counter, word by word, so it is not built again after updates
+    """
+
+    def __init__(self, counter: Counter):
+        self.by_count: Dict[int, Dict[str, None]] = {}
+        self.by_length: Dict[int, Dict[str, None]] = {}
+        self._ranks: Dict[str, int] = {}
+        for rank, (word, count) in enumerate(counter.items()):
+            self._ranks[word] = rank
+            self.by_count.setdefault(count, {})[word] = None
+            self.by_length.setdefault(len(word), {})[word] = None
+        self.counts: List[int] = sorted(self.by_count)
+        self._next_rank = len(self._ranks)
+        self._unordered: Set[int] = set()
+
+    def group(self, count: int) -> List[str]:
+        """
+        Returns words with given count in order of the counter
+        """
+        group = self.by_count.get(count)
+        if group is None:
+            return []
+        if count not in self._unordered:
+            return list(group)
+        words = sorted(group, key=self._ranks.__getitem__)
+        self.by_count[count] = dict.fromkeys(words)
+        self._unordered.discard(count)
+        return words
+
+    def change(self, word: str, old: int, new: int) -> None:
+        """
+        Moves word from the group of old count to the group of new count, 0 for absent word. New word is the last in
+        order of the counter, like new key of the dictionary
+        """
+        if old:
+            group = self.by_count[old]
+            del group[word]
+            if not group:
+                del self.by_count[old]
+                self.counts.remove(old)
+                self._unordered.discard(old)
+        else:
+            self._ranks[word] = self._next_rank
+            self._next_rank += 1
+            self.by_length.setdefault(len(word), {})[word] = None
+        if new:
+            group = self.by_count.get(new)
+            if group is None:
+                group = self.by_count[new] = {}
+                insort(self.counts, new)
+            if group:
+                self._unordered.add(new)
+            group[word] = None
+        else:
+            del self._ranks[word]
+            group = self.by_length[len(word)]
+            del group[word]
+            if not group:
+                del self.by_length[len(word)]
+
+    def most_common(self) -> Iterator[str]:
+        """
+        Yields words from most common to less common, words with same count in order of the counter
+        """
+        return chain.from_iterable(self.group(count) for count in reversed(self.counts))
+
+    def less_common(self) -> Iterator[str]:
+        """
+        Yields words from less common to most common, words with same count in reversed order of the counter
+        """
+        return chain.from_iterable(reversed(self.group(count)) for count in self.counts)
+
 
 class Statistics:
-    def __init__(self, content: str, ignored='-1234567890'):
+    __slots__ = ('words', 'words_count', 'counter', '_index', '_tokenizer')
+
+    def __init__(self, content: str, ignored='-1234567890', tokenizer: Optional[Tokenizer] = None,
+                 keep_words: bool = True):
         """
         Creates statistic object for given text, lower it, parse it for words by spaces and ignoring punctuation.
         If words in sequence ignored, then it won't be in resulting statistics.
-        For example, if '-' in ignored argument, then word '-' will not appear at results
+        For example, if '-' in ignored argument, then word '-' will not appear at results, but word '-1' will
+        If keep_words is False, object is lean: only counter and totals are kept, words attribute is None and
+        unique_words is a view over the counter instead of the list
         :param content: string representation of some text
-        :param ignored: sequence for ignore words
+        :param ignored: sequence for ignore words, for string each symbol is a word
+        :param tokenizer: tokenizer for custom rules of parsing words, ignored argument is not used if it is given
+        :param keep_words: keep all words of the text (in original case) in words attribute, True by default
+        """
+        self._tokenizer = tokenizer or Tokenizer(ignored=ignored)
+        with profiling.timer('statistics.count'):
+            if not keep_words:
+                counter: Counter = Counter()
+                self.words: Optional[List[str]] = None
+                self._set_counter(counter, self._tokenizer.count(content, counter))
+            else:
+                self.words = self._tokenizer.words(content)
+                self._set_counter(Counter(map(str.lower, self.words)), len(self.words))
+        profiling.count('statistics.words', self.words_count)
+
+    @classmethod
+    def from_stream(cls, source: Union[str, Path, TextIO, Iterable[str]],  # pylint: disable=too-many-arguments
+                    ignored='-1234567890', encoding='utf-8', chunk_size: int = 1 << 20,
+                    tokenizer: Optional[Tokenizer] = None) -> 'Statistics':
         """
-        self.words = [e for e in re.split(r"[^\w'-]+", content) if e and e not in ignored]
-        self.words_count = len(self.words)
-        self.counter = Counter(e.lower() for e in self.words)
-        self.unique_words = list(self.counter.keys())
-        self.unique_words_count = len(self.unique_words)
+        Creates statistic object for text, which is read by chunks, so whole text is never kept in memory. Words split
+        between chunks are joined back. Resulting object is the same as for Statistics(text, ignored, keep_words=False),
+        so only counter and totals are kept
+        :param source: path to the text file (string or Path), text file object or iterable of text chunks (strings)
+        :param ignored: sequence for ignore words, for string each symbol is a word
+        :param encoding: encoding for reading file by path, UTF-8 by default
+        :param chunk_size: size of the chunk (in characters) for reading files
+        :param tokenizer: tokenizer for custom rules of parsing words, ignored argument is not used if it is given
+        :return: Statistics object
+        """
+        if isinstance(source, (str, Path)):
+            with open(source, encoding=encoding) as file:
+                return cls.from_stream(file, ignored, chunk_size=chunk_size, tokenizer=tokenizer)
+        if hasattr(source, 'read'):
+            source = iter(partial(source.read, chunk_size), '')
+        tokenizer = tokenizer or Tokenizer(ignored=ignored)
+        counter: Counter = Counter()
+        words_count = 0
+        with profiling.timer('statistics.count'):
+            for chunk in tokenizer.join_words(source):
+                words_count += tokenizer.count(chunk, counter)
+        profiling.count('statistics.words', words_count)
+        return cls._from_counter(counter, words_count, tokenizer)
+
+    @property
+    def unique_words(self) -> Collection[str]:
+        """
+        Unique lowered words of the text, in order of the first appearance. It is a list for objects with words and a
+        view over the counter (without copying) for lean objects
+        """
+        if self.words is None:
+            return self.counter.keys()
+        return list(self.counter)
+
+    @property
+    def unique_words_count(self) -> int:
+        """
+        Number of unique words of the text
+        """
+        return len(self.counter)
 
     def most_common(self, limit: int = 0) -> List[Tuple]:
         """
@@ -26,13 +192,13 @@ class Statistics:
         For example, for text 'a a a b b' it will be [('a', 3), ('b', 2)]
         Limit argument limiting result, if it is less or equal zero - all results will be return, but limit can be
         bigger, than actual results count
-        Analog (wrapper) of Counter.most_common
+        Analog of Counter.most_common, but takes words from groups by count, without sorting of all words
         :param limit: how many words should be in result
         :return: list of pairs word-count
         """
-        if limit <= 0:
-            limit = None
-        return self.counter.most_common(limit)
+        counter = self.counter
+        results = ((word, counter[word]) for word in self._frequency_index().most_common())
+        return from_generator(results, limit)
 
     def less_common(self, limit: int = 0) -> List[Tuple]:
         """
@@ -44,7 +210,8 @@ class Statistics:
         :param limit: how many words should be in result
         :return: list of pairs word-count
         """
-        results = reversed(self.counter.most_common())
+        counter = self.counter
+        results = ((word, counter[word]) for word in self._frequency_index().less_common())
         return from_generator(results, limit)
 
     def words_with_count(self, count: int, *, limit: int = 0) -> List[str]:
@@ -57,7 +224,7 @@ class Statistics:
         :param limit: how many words should be in result
         :return: list of strings
         """
-        results = (a for a, b in self.counter.items() if b == count)
+        results = iter(self._frequency_index().group(count))
         return from_generator(results, limit)
 
     def words_with_length(self, length: int, *, limit: int = 0):
@@ -70,9 +237,309 @@ class Statistics:
         :param limit: how many words should be in result
         :return: list of strings
         """
-        results = (a for a in self.counter.keys() if len(a) == length)
+        results = iter(self._frequency_index().by_length.get(length, {}))
         return from_generator(results, limit)
 
+    def coverage(self, dictionary: Union[str, Container[str]] = 'ru') -> Coverage:
+        """
+        Checks words of the text against the dictionary and splits them to known and unknown ones (out of vocabulary).
+        Dictionary is a name of bundled or registered dictionary (its shared set of words is used), Dictionary object,
+        set of words, BloomFilter (for big lists of words, some unknown words can be taken as known with its error)
+        or iterable of words. Words of the statistic are in lower case, so words of the dictionary should be too
+        :param dictionary: dictionary to check with, 'ru' by default
+        :return: Coverage object with known and unknown words and their counts
+        :raises ValueError if dictionary with given name is not registered
+        """
+        vocabulary = _vocabulary(dictionary)
+        pairs = self.most_common()
+        found = list(map(vocabulary.__contains__, (word for word, _ in pairs)))
+        known = list(compress(pairs, found))
+        unknown = list(compress(pairs, (not e for e in found)))
+        known_count = sum(count for _, count in known)
+        return Coverage(known, unknown, known_count, self.words_count - known_count)
+
+    def merge(self, *others: 'Statistics') -> 'Statistics':
+        """
+        Returns new statistic object for all texts of this and other statistic objects, as if they were one text.
+        Words are not parsed again, only counters are summed. Words attribute of result is None if some of the objects
+        has no words
+        :param others: other Statistics objects
+        :return: new Statistics object
+        """
+        counter = Counter(self.counter)
+        for other in others:
+            counter.update(other.counter)
+        stat = Statistics._from_counter(counter, self.words_count + sum(e.words_count for e in others), self._tokenizer)
+        if self.words is not None and all(e.words is not None for e in others):
+            stat.words = self.words + [word for e in others for word in e.words]
+        return stat
+
+    def update(self, content: Union[str, 'Statistics']) -> None:
+        """
+        Adds words of the text (or of other statistic object) to this statistic, as if texts were one text. Only new
+        words are parsed and counted, frequency queries stay consistent
+        :param content: string representation of some text or Statistics object
+        :return: None
+        """
+        if isinstance(content, Statistics):
+            if self.words is not None and content.words is not None:
+                self.words.extend(content.words)
+            else:
+                self.words = None
+            self._change(content.counter, content.words_count)
+        elif self.words is not None:
+            words = self._tokenizer.words(content)
+            self.words.extend(words)
+            self._change(Counter(map(str.lower, words)), len(words))
+        else:
+            self._change(*self._count(content))
+
+    def subtract(self, content: Union[str, 'Statistics']) -> None:
+        """
+        Removes words of the text (or of other statistic object), which was added before, from this statistic. Words
+        with zero count are removed from results, words which are not in this statistic are ignored. Words attribute
+        becomes None, as only counter and totals are changed
+        :param content: string representation of some text or Statistics object
+        :return: None
+        """
+        self.words = None
+        counter, words_count = (content.counter, content.words_count) if isinstance(content, Statistics) \
+            else self._count(content)
+        self._change(counter, words_count, -1)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Saves counter and totals of this statistic to the binary file (words attribute is not saved), which can be
+        loaded with Statistics.load
+        :param path: path to the file
+        :return: None
+        :raises ValueError if some word contains line break
+        """
+        words = '\n'.join(self.counter)
+        if words.count('\n') != max(len(self.counter) - 1, 0):
+            raise ValueError('Words with line breaks can not be saved')
+        write_sections(path, _STATISTICS, {
+            'totals': array('Q', [self.words_count, len(self.counter)]),
+            'counts': array('Q', self.counter.values()),
+            'words': words.encode('utf-8'),
+        })
+
+    @classmethod
+    def load(cls, path: Union[str, Path], tokenizer: Optional[Tokenizer] = None) -> 'Statistics':
+        """
+        Loads statistic object from the binary file, saved with save method. File is read through memory map. Resulting
+        object is the same as saved one, except words attribute, which is None
+        :param path: path to the file
+        :param tokenizer: tokenizer for next updates of the object, default tokenizer if None
+        :return: Statistics object
+        :raises ValueError if file is not a statistic file, it has unsupported format version or it is corrupted
+        """
+        sections = read_sections(path, _STATISTICS)
+        missing = [e for e in ('totals', 'counts', 'words') if e not in sections]
+        if missing:
+            raise ValueError(f'File {path} has no sections {", ".join(missing)}')
+        words_count, size = to_array(sections['totals'], 'Q')
+        words = str(sections['words'], 'utf-8').split('\n') if size else []
+        counts = to_array(sections['counts'], 'Q')
+        if not len(counts) == len(words) == size:
+            raise ValueError(f'File {path} is corrupted, sizes of sections do not match number of words')
+        counter = Counter(dict(zip(words, counts.tolist())))
+        return cls._from_counter(counter, words_count, tokenizer)
+
+    def __add__(self, other: 'Statistics') -> 'Statistics':
+        if not isinstance(other, Statistics):
+            return NotImplemented
+        return self.merge(other)
+
+    @classmethod
+    def _from_counter(cls, counter: Counter, words_count: int, tokenizer: Optional[Tokenizer] = None) -> 'Statistics':
+        stat = cls.__new__(cls)
+        stat.words = None
+        stat._tokenizer = tokenizer or Tokenizer()
+        stat._set_counter(counter, words_count)
+        return stat
+
+    def _count(self, content: str) -> Tuple[Counter, int]:
+        counter: Counter = Counter()
+        with profiling.timer('statistics.count'):
+            words_count = self._tokenizer.count(content, counter)
+        profiling.count('statistics.words', words_count)
+        return counter, words_count
+
+    def _change(self, counter: Counter, words_count: int, sign: int = 1) -> None:
+        # words with not positive count are removed from the counter, so order of the counter is order of appearance.
+        # On subtract only words present in the counter are removed from words count, others are ignored
+        own, index = self.counter, self._index
+        removed = 0
+        for word, count in counter.items():
+            old = own.get(word, 0)
+            new = max(old + sign * count, 0)
+            if new:
+                own[word] = new
+            elif old:
+                del own[word]
+            if index is not None and old != new:
+                index.change(word, old, new)
+            removed += old - new
+        self.words_count += words_count if sign > 0 else -removed
+
+    def _frequency_index(self) -> _FrequencyIndex:
+        if self._index is None:
+            self._index = _FrequencyIndex(self.counter)
+        return self._index
+
+    def _set_counter(self, counter: Counter, words_count: int) -> None:
+        self.words_count = words_count
+        self.counter = counter
+        self._index: Optional[_FrequencyIndex] = None
+
     def __repr__(self):
         return f'Text statistic: words count={self.words_count}, unique words count={self.unique_words_count}, ' \
                f'3 most common words={self.most_common(3)}, 3 less common words={self.less_common(3)}'
+
+
+class WindowedStatistics(Statistics):
+    """
+    Statistic of the last texts only. Each text added by update is a document, documents expire when there are more
+    than documents of them or when they are older than seconds, expired documents are subtracted from the statistic.
+    So counts and frequency queries are always for documents in the window, each update costs only words of added and
+    expired documents. Only counter and totals are kept, words attribute is None
+    """
+    __slots__ = ('documents', 'seconds', '_window')
+
+    def __init__(self, documents: int = 0, seconds: float = 0, ignored=IGNORED, tokenizer: Optional[Tokenizer] = None):
+        """
+        Creates empty windowed statistic object, at least one of the limits should be given
+        :param documents: maximal number of documents in the window, if it is less or equal zero - not limited
+        :param seconds: maximal age of documents in the window, if it is less or equal zero - not limited
+        :param ignored: sequence for ignore words, for string each symbol is a word
+        :param tokenizer: tokenizer for custom rules of parsing words, ignored argument is not used if it is given
+        :raises ValueError if there are no limits
+        """
+        if documents <= 0 and seconds <= 0:
+            raise ValueError('Documents or seconds limit should be positive')
+        super().__init__('', ignored, tokenizer, keep_words=False)
+        self.documents = max(documents, 0)
+        self.seconds = max(seconds, 0)
+        self._window: Deque[Tuple[float, Counter, int]] = deque()
+
+    def update(self, content: Union[str, Statistics], timestamp: Optional[float] = None) -> None:
+        """
+        Adds the text (or other statistic object) as a new document of the window and expires old documents
+        :param content: string representation of some text or Statistics object
+        :param timestamp: time of the document in seconds, time.monotonic() by default
+        :return: None
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        if isinstance(content, Statistics):
+            counter, words_count = Counter(content.counter), content.words_count
+        else:
+            counter, words_count = self._count(content)
+        self._change(counter, words_count)
+        self._window.append((timestamp, counter, words_count))
+        self.expire(timestamp)
+
+    def expire(self, now: Optional[float] = None) -> None:
+        """
+        Subtracts documents, which are out of the window, for time window it should be called to expire old documents
+        without adding new ones
+        :param now: current time in seconds, time.monotonic() by default
+        :return: None
+        """
+        now = time.monotonic() if now is None else now
+        window = self._window
+        while window and (0 < self.documents < len(window) or (self.seconds and window[0][0] <= now - self.seconds)):
+            _, counter, words_count = window.popleft()
+            self._change(counter, words_count, -1)
+
+    def __len__(self):
+        return len(self._window)
+
+
+class ApproximateStatistics:
+    """
+    Approximate statistic of texts for unbounded feeds of text in fixed memory. Texts are added by update. The most
+    common words are kept by Space-Saving top-k (not more than capacity words), number of unique words is estimated by
+    HyperLogLog. Counts of the most common words are never smaller than real ones and each of them has its own error
+    bound, words_count is exact
+    """
+    __slots__ = ('words_count', '_tokenizer', '_top', '_unique')
+
+    def __init__(self, content: str = '', capacity: int = 1000, ignored=IGNORED, tokenizer: Optional[Tokenizer] = None,
+                 precision: int = 12):
+        """
+        Creates approximate statistic object for given text
+        :param content: string representation of some text, more texts can be added with update
+        :param capacity: maximal number of kept most common words
+        :param ignored: sequence for ignore words, for string each symbol is a word
+        :param tokenizer: tokenizer for custom rules of parsing words, ignored argument is not used if it is given
+        :param precision: precision of HyperLogLog for unique words count, relative error is 1.04 / sqrt(2 ** precision)
+        :raises ValueError if capacity is less than 1 or precision is out of range (4, 18)
+        """
+        self.words_count = 0
+        self._tokenizer = tokenizer or Tokenizer(ignored=ignored)
+        self._top = SpaceSaving(capacity)
+        self._unique = HyperLogLog(precision)
+        self.update(content)
+
+    @property
+    def unique_words_count(self) -> int:
+        """
+        Approximate number of unique words, relative standard error is unique_words_error
+        """
+        return self._unique.count()
+
+    @property
+    def unique_words_error(self) -> float:
+        """
+        Relative standard error of unique_words_count
+        """
+        return self._unique.error
+
+    def update(self, content: str) -> None:
+        """
+        Adds words of one more text. Words are counted for the text first, so each unique word of the text updates
+        approximate structures once
+        :param content: string representation of some text
+        :return: None
+        """
+        counter: Counter = Counter()
+        self.words_count += self._tokenizer.count(content, counter)
+        top, unique = self._top, self._unique
+        for word, count in counter.items():
+            top.add(word, count)
+            unique.add(word)
+
+    def most_common(self, limit: int = 0) -> List[Tuple]:
+        """
+        Returns list of triples(tuples) of most common words with their counts and errors, like
+        [('word', count, error)]. Real count of the word is in range from count - error to count
+        Limit argument limiting result, if it is less or equal zero - all kept words will be return
+        :param limit: how many words should be in result
+        :return: list of triples word-count-error
+        """
+        errors = self._top.errors
+        return [(word, count, errors[word]) for word, count in self._top.most_common(limit)]
+
+    def max_error(self) -> int:
+        """
+        Returns maximal error of counts of kept words, real count of any word, which is not kept, is not bigger than it
+        :return: number
+        """
+        return self._top.minimum()
+
+    def __repr__(self):
+        return f'Approximate text statistic: words count={self.words_count}, unique words count~' \
+               f'{self.unique_words_count}, 3 most common words={self.most_common(3)}'
+
+
+def _vocabulary(dictionary: Union[str, Container[str]]) -> Container[str]:
+    if isinstance(dictionary, str):
+        if not has_dictionary(dictionary):
+            raise ValueError(f'Dictionary {dictionary} is not registered')
+        return get_dictionary(dictionary).vocabulary()
+    if isinstance(dictionary, Dictionary):
+        return dictionary.vocabulary()
+    if isinstance(dictionary, (set, frozenset, dict, BloomFilter)) or not isinstance(dictionary, Iterable):
+        return dictionary
+    return frozenset(dictionary)
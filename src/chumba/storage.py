@@ -0,0 +1,105 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Sequence, Union
+
+MAGIC = b'CHMB'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sH8sI')
+_SECTION = struct.Struct('<8sQQ')
+_ALIGN = 8
+
+
+def write_sections(path: Union[str, Path], kind: str, sections: Dict[str, Any]) -> None:
+    """
+    Writes binary data file atomically: header (magic, format version, kind of the data), table of sections and
+    sections itself, each section starts on 8 bytes border, so numeric sections can be used from memory map without
+    copying. Numeric sections are arrays, they are written in little-endian order. For internal use
+    :param path: path to the file
+    :param kind: kind of the data, up to 8 ASCII symbols
+    :param sections: names of sections (up to 8 ASCII symbols) and their data (bytes or arrays)
+    :return: None
+    """
+    blobs = [(name, _to_bytes(data)) for name, data in sections.items()]
+    offset = _align(_HEADER.size + _SECTION.size * len(blobs))
+    table = []
+    for name, blob in blobs:
+        table.append(_SECTION.pack(name.encode('ascii'), offset, len(blob)))
+        offset = _align(offset + len(blob))
+    # file is written under temporary name and replaced at once, so readers never see partly written file
+    temporary = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary, 'wb') as file:
+            file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, kind.encode('ascii'), len(blobs)))
+            file.write(b''.join(table))
+            for _, blob in blobs:
+                file.write(b'\0' * (_align(file.tell()) - file.tell()))
+                file.write(blob)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def read_sections(path: Union[str, Path], kind: str) -> Dict[str, memoryview]:
+    """
+    Reads binary data file, written by write_sections, through memory map: sections are views of the mapped file,
+    nothing is copied until sections are used. For internal use
+    :param path: path to the file
+    :param kind: expected kind of the data
+    :return: names of sections and their data as memory views of bytes
+    :raises ValueError if file is not a data file, it has another kind of the data, unsupported format version or it is
+    truncated
+    """
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if file.seek(0, 2) else b''
+    view = memoryview(mapped)
+    if len(view) < _HEADER.size or view[:4] != MAGIC:
+        raise ValueError(f'File {path} is not a chumba data file')
+    _, version, found, count = _HEADER.unpack_from(view)
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported format version {version} of {path}, expected {FORMAT_VERSION}')
+    found = found.rstrip(b'\0').decode('ascii')
+    if found != kind:
+        raise ValueError(f'File {path} contains {found} data, expected {kind}')
+    if len(view) < _HEADER.size + count * _SECTION.size:
+        raise ValueError(f'File {path} is truncated or corrupted')
+    sections = {}
+    for i in range(count):
+        name, offset, size = _SECTION.unpack_from(view, _HEADER.size + i * _SECTION.size)
+        if offset + size > len(view):
+            raise ValueError(f'File {path} is truncated or corrupted')
+        sections[name.rstrip(b'\0').decode('ascii')] = view[offset:offset + size]
+    return sections
+
+
+def to_array(data: memoryview, typecode: str) -> Sequence[int]:
+    """
+    Returns numeric section as sequence of numbers, on little-endian machines it is a view without copying
+    :param data: section from read_sections
+    :param typecode: type code of numbers, like in array module
+    :return: memory view or array of numbers
+    :raises ValueError if size of the section is not a multiple of the size of numbers
+    """
+    if len(data) % array(typecode).itemsize:
+        raise ValueError(f'Size {len(data)} of the section is not a multiple of the size of {typecode} numbers')
+    if sys.byteorder == 'little':
+        return data.cast(typecode)
+    numbers = array(typecode)
+    numbers.frombytes(data)
+    numbers.byteswap()
+    return numbers
+
+
+def _to_bytes(data: Any) -> bytes:
+    if isinstance(data, array) and sys.byteorder != 'little':
+        data = array(data.typecode, data)
+        data.byteswap()
+    return bytes(data)
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
@@ -0,0 +1,102 @@
+import re
+from collections import Counter
+from typing import Iterable, Iterator, List
+
+WORD_SYMBOLS = r"\w'-"
+IGNORED = '-1234567890'
+# lowering of the whole text differs from lowering of each word for these letters: dotted I expands to two symbols
+# and capital sigma becomes final or not depending on next letters
+_CONTEXTUAL = ('İ', 'Σ')
+
+
+class Tokenizer:
+    """
+    Splits text to words: word is a sequence of word symbols (letters, digits, underscore, apostrophe and hyphen by
+    default). Words from ignored are skipped, case of ignored words does not matter. For custom rules create tokenizer
+    with other symbols or subclass it and override tokens and border methods
+    """
+
+    def __init__(self, symbols: str = WORD_SYMBOLS, ignored: Iterable[str] = IGNORED):
+        """
+        Creates tokenizer
+        :param symbols: symbols of words, as content of regular expression set (without brackets)
+        :param ignored: sequence of ignored words, for string each symbol is a word
+        """
+        self.ignored = frozenset(e.lower() for e in ignored)
+        self._caseless = all(e == e.upper() for e in self.ignored)
+        self._pattern = re.compile(f'[{symbols}]+')
+        self._symbol = re.compile(f'[{symbols}]')
+
+    def tokens(self, text: str) -> List[str]:
+        """
+        Returns all tokens of the text in original case, including ignored
+        :param text: any text
+        :return: list of tokens
+        """
+        return self._pattern.findall(text)
+
+    def words(self, text: str) -> List[str]:
+        """
+        Returns words of the text in original case, without ignored
+        :param text: any text
+        :return: list of words
+        """
+        ignored = self.ignored
+        if self._caseless:
+            return [e for e in self.tokens(text) if e not in ignored]
+        return [e for e in self.tokens(text) if e.lower() not in ignored]
+
+    def lowered_words(self, text: str) -> List[str]:
+        """
+        Returns lowered words of the text, without ignored
+        :param text: any text
+        :return: list of words
+        """
+        if any(e in text for e in _CONTEXTUAL):
+            tokens = [e.lower() for e in self.tokens(text)]
+        else:
+            tokens = self.tokens(text.lower())
+        ignored = self.ignored
+        return [e for e in tokens if e not in ignored] if ignored else tokens
+
+    def count(self, text: str, counter: Counter) -> int:
+        """
+        Counts lowered words of the text (without ignored) into given counter in one pass. Words are not collected,
+        the whole text is lowered at once instead of each word
+        :param text: any text
+        :param counter: counter to update, should not contain ignored words
+        :return: number of counted words
+        """
+        if any(e in text for e in _CONTEXTUAL):
+            tokens = [e.lower() for e in self.tokens(text)]
+        else:
+            tokens = self.tokens(text.lower())
+        counter.update(tokens)
+        return len(tokens) - sum(counter.pop(word, 0) for word in self.ignored)
+
+    def border(self, text: str) -> int:
+        """
+        Returns index of the start of the last word, if the text ends with a word (so the word may continue in the
+        next part of the text), or length of the text otherwise
+        :param text: any text
+        :return: index in text
+        """
+        border = len(text)
+        while border and self._symbol.match(text[border - 1]):
+            border -= 1
+        return border
+
+    def join_words(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Yields chunks of text, each ending on the border of the word: the unfinished word at the end of the chunk is
+        moved to the next chunk
+        :param chunks: iterable of parts of the text
+        :return: iterator of parts of the text
+        """
+        rest = ''
+        for chunk in chunks:
+            text = rest + chunk
+            border = self.border(text)
+            rest = text[border:]
+            yield text[:border]
+        yield rest
@@ -1,7 +1,11 @@
+import threading
+from collections import OrderedDict
 from enum import Enum
 from itertools import islice
 from pathlib import Path
-from typing import List, Union, Generator, Any
+from typing import List, Union, Generator, Any, Hashable
+
+from . import profiling
 
 
 class Lang(Enum):
@@ -11,6 +15,20 @@ class Lang(Enum):
     RU = 'ru'
     EN = 'en'
 
+    @property
+    def alphabet(self) -> str:
+        """
+        Letters of the language in alphabetical order
+        :return: string of letters
+        """
+        return _ALPHABETS[self.value]
+
+
+_ALPHABETS = {
+    'ru': 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя',
+    'en': 'abcdefghijklmnopqrstuvwxyz',
+}
+
 
 def read_data_file(lang: str, encoding='utf-8') -> List[str]:
     """
@@ -22,7 +40,10 @@ def read_data_file(lang: str, encoding='utf-8') -> List[str]:
     """
     real_path = Path(__file__).parent
     file_name = real_path / 'data' / f'words_{lang}.txt'
-    return [e.rstrip() for e in read_file(file_name, encoding)]
+    with profiling.timer('dictionary.read'):
+        words = [e.rstrip() for e in read_file(file_name, encoding)]
+    profiling.count('dictionary.words', len(words))
+    return words
 
 
 def read_file(file_name: Union[Path, str], encoding='utf-8') -> List[str]:
@@ -48,3 +69,55 @@ def from_generator(gen: Union[Generator, reversed], limit: int) -> List[Any]:
     if limit <= 0:
         return list(gen)
     return list(islice(gen, limit))
+
+
+class LRUCache:
+    """
+    Thread-safe mapping with limited size: when size is exceeded, the least recently used item is removed
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Creates empty cache
+        :param maxsize: maximum number of items in cache
+        """
+        self.maxsize: int = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns value for given key and marks it as recently used, or default if there is no such key
+        :param key: key of the item
+        :param default: value to return if key is absent
+        :return: value or default
+        """
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Puts value for given key, removes the least recently used item if cache is full
+        :param key: key of the item
+        :param value: any value
+        :return: None
+        """
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all items from cache
+        :return: None
+        """
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
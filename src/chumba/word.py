@@ -1,20 +1,106 @@
-from typing import List, Tuple, Callable, Generator
+import copy
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple, Generator, Optional, Sequence, Union
 
-from .utils import from_generator, read_data_file, Lang
+from .conditions import (Condition, LENGTH, LETTER, PREFIX, SUFFIX, CONTAINS, NOT_CONTAINS, ANAGRAM, SUB_ANAGRAM,
+                         SIMILAR, letters_signature, parse_pattern, parse_regex)
+from . import profiling
+from .dictionary import get_dictionary, has_dictionary, ENGINES
+from .index import WordIndex
+from .utils import from_generator, Lang
 
 
-class Word:
+class Word:  # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, length: int = 0, is_ru=True):
+    def __init__(self, length: int = 0, is_ru=True, engine: str = 'index', dictionary: Optional[str] = None):
         """
         Create instance of word wrapper - a tool to search for word in dictionaries with various conditions.
         :param length: length of the searched word, if it less or equals to zero - word of any length will be searched
         :param is_ru: is lang of the dictionary to look in is Russian, will be English if False
+        :param engine: search engine, 'index' (pure Python, default) or 'numpy' (vectorized, needs NumPy installed)
+        :param dictionary: name of the custom dictionary (see register_dictionary) to look in instead of is_ru
+        :raises ValueError if engine or dictionary is unknown
         """
+        if engine not in ENGINES:
+            raise ValueError(f'Engine should be one of {list(ENGINES)}, got {engine}')
+        if dictionary is not None and not has_dictionary(dictionary):
+            raise ValueError(f'Dictionary {dictionary} is not registered')
+        self._engine: str = engine
         self._length: int = length if length > 0 else 0
-        self._lang: str = str(Lang.RU.value) if is_ru else str(Lang.EN.value)
-        self._cached: List[str] = []
-        self._conditions: List[Callable] = [lambda w: len(w) == self._length] if self._length else []
+        self._lang: str = dictionary or (str(Lang.RU.value) if is_ru else str(Lang.EN.value))
+        self._cached: Sequence[str] = []
+        self._index: Optional[WordIndex] = None
+        self._snapshots: List[Tuple[int, Sequence[int]]] = []
+        self._marks: List[int] = []
+        self._conditions: List[Condition] = [Condition(LENGTH, self._length)] if self._length else []
+
+    @classmethod
+    def pattern(cls, pattern: str, is_ru=True, engine: str = 'index', dictionary: Optional[str] = None) -> 'Word':
+        """
+        Creates Word with conditions from wildcard pattern: each symbol of the pattern is a letter on its index, '_' or
+        '?' for any letter, or '*' for any number of letters. Without '*' length of the word is length of the pattern.
+        For example, 'а_б__' is the same as Word(5) with letter_at_index_is(0, 'а') and letter_at_index_is(2, 'б'),
+        'к?т*' is any word starting with 'к' with 'т' at index 2. Other conditions can be added to the result as usual
+        :param pattern: string pattern
+        :param is_ru: is lang of the dictionary to look in is Russian, will be English if False
+        :param engine: search engine, 'index' or 'numpy'
+        :param dictionary: name of the custom dictionary to look in instead of is_ru
+        :return: Word object
+        :raises ValueError if pattern is empty or dictionary is unknown
+        """
+        conditions = parse_pattern(pattern)
+        length = next((value for kind, value in conditions if kind == LENGTH), 0)
+        word = cls(length, is_ru, engine, dictionary)
+        word._conditions = conditions
+        return word
+
+    @classmethod
+    def regex(cls, expression: str, is_ru=True, engine: str = 'index', dictionary: Optional[str] = None) -> 'Word':
+        """
+        Creates Word with condition, that the whole word matches given regular expression (case is ignored). Other
+        conditions can be added to the result as usual
+        :param expression: regular expression
+        :param is_ru: is lang of the dictionary to look in is Russian, will be English if False
+        :param engine: search engine, 'index' or 'numpy'
+        :param dictionary: name of the custom dictionary to look in instead of is_ru
+        :return: Word object
+        :raises re.error if expression is not valid
+        :raises ValueError if dictionary is unknown
+        """
+        word = cls(0, is_ru, engine, dictionary)
+        word._conditions = parse_regex(expression)
+        return word
+
+    @staticmethod
+    def examples_many(queries: Iterable[Union[str, 'Word']], is_ru=True, limit: int = 0,
+                      dictionary: Optional[str] = None) -> List[List[str]]:
+        """
+        Returns results for many queries at once. Query is a Word object with its conditions or a wildcard pattern
+        like 'а_б__' or 'к?т*' (see Word.pattern). Patterns are searched in the dictionary chosen by is_ru (or by
+        dictionary).
+        Dictionaries are loaded once for all queries, queries are evaluated grouped by length and share intersections of
+        the same letter conditions
+        :param queries: iterable of Word objects or string patterns
+        :param is_ru: is lang of the dictionary for patterns is Russian, will be English if False
+        :param limit: size of each resulting list, if <= 0 then all results
+        :param dictionary: name of the custom dictionary for patterns instead of is_ru
+        :return: list of lists of string results, in the same order as queries
+        :raises ValueError if some pattern is empty or dictionary is unknown
+        """
+        # pylint: disable=protected-access
+        words = [Word.pattern(e, is_ru, dictionary=dictionary) if isinstance(e, str) else e for e in queries]
+        groups: Dict[int, Tuple[WordIndex, List[int]]] = {}
+        for i, word in enumerate(words):
+            if not word._cached:
+                word._read_all(word._lang)
+            index = word._get_index()
+            groups.setdefault(id(index), (index, []))[1].append(i)
+        results: List[List[str]] = [[] for _ in words]
+        for index, positions in groups.values():
+            selected = index.select_many(words[i]._conditions for i in positions)
+            for i, ids in zip(positions, selected):
+                results[i] = from_generator((index.words[e] for e in ids), limit)
+        return results
 
     def examples(self, limit: int = 0) -> List[str]:
         """
@@ -23,11 +109,42 @@ class Word:
         :param limit: size of the resulting list, if <= 0 then all results
         :return: list of string results
         """
-        if not self._cached:
-            self._read_all(self._lang)
         results = self._apply_all_conditions()
         return from_generator(results, limit)
 
+    def iter_examples(self, offset: int = 0) -> Iterator[str]:
+        """
+        Returns iterator over results matching the predefined conditions. Candidates are found by the index at once,
+        but conditions like regex are checked while words are taken, so first results are given before the whole
+        search is done. Found ids are kept for next queries only if iteration is finished. Results are in order of
+        the dictionary, which is stable for the same conditions, conditions added after the call do not change the
+        iterator
+        :param offset: number of results to skip
+        :return: iterator of string results
+        :raises ValueError if offset is negative
+        """
+        if offset < 0:
+            raise ValueError(f'Offset should not be negative, got {offset}')
+        selected = self._iter_select()
+        words = self._cached
+        return (words[i] for i in islice(selected, offset, None))
+
+    def page(self, offset: int, size: int) -> List[str]:
+        """
+        Returns one page of results matching the predefined conditions: size results after skipping offset ones, in
+        order of the dictionary. Found ids are kept, so next pages (even of another Word with the same conditions) are
+        taken without new search
+        :param offset: number of results to skip
+        :param size: size of the page
+        :return: list of string results, shorter than size (or empty) for the last page
+        :raises ValueError if offset is negative or size is not positive
+        """
+        if offset < 0 or size <= 0:
+            raise ValueError(f'Offset should not be negative and size should be positive, got {offset} and {size}')
+        selected = self._select()
+        words = self._cached
+        return [words[i] for i in selected[offset:offset + size]]
+
     def letter_at_index_is(self, index: int, letter: str) -> None:
         """
         Adds condition, that search word is contains given letter on given index. Index starts with 0 (not 1).
@@ -42,7 +159,7 @@ class Word:
         if len(letter) != 1:
             raise ValueError(f'Letter should have length 1, got {len(letter)}')
         letter = letter.lower()
-        self._conditions.append(lambda w: w[index] == letter)
+        self._add_conditions(Condition(LETTER, (index, letter)))
 
     def starts_with(self, prefix: str) -> None:
         """
@@ -80,31 +197,154 @@ class Word:
         """
         self._contains(letters, is_contains=False)
 
+    def anagram_of(self, letters: str) -> None:
+        """
+        Adds condition, that search word consists of exactly given letters in any order (is an anagram of them), so
+        length of the word is the number of letters. For example, 'кот' for 'ток' and 'кто'. Words are found by their
+        letters signature, without scanning of the dictionary
+        :param letters: string of letters, each letter is used exactly as many times as it is given
+        :return: None
+        :raises ValueError if letters are empty or their number is not equal to length of the word
+        """
+        if not letters:
+            raise ValueError('Letters should not be empty')
+        if self._length and len(letters) != self._length:
+            raise ValueError(f'Number of letters {len(letters)} is not equal to word length({self._length})')
+        self._add_conditions(Condition(ANAGRAM, letters_signature(letters.lower())))
+
+    def made_of(self, letters: str) -> None:
+        """
+        Adds condition, that search word can be made of given letters (is a sub-anagram of them): it contains only
+        given letters, each not more times than it is given. For example, 'кот', 'ток' and 'кто' for 'откос'. Use with
+        length of the word to get words of exact length. Words are found by signatures of parts of letters or, for long
+        strings of letters, by letters masks
+        :param letters: string of letters, each letter can be used up to as many times as it is given
+        :return: None
+        :raises ValueError if letters are empty
+        """
+        if not letters:
+            raise ValueError('Letters should not be empty')
+        self._add_conditions(Condition(SUB_ANAGRAM, letters_signature(letters.lower())))
+
+    def similar_to(self, word: str, distance: int = 1) -> None:
+        """
+        Adds condition, that search word is within given edit (Levenshtein) distance from the word: it can be made from
+        the word with not more than distance inserted, deleted or replaced letters. For example, 'кит', 'код', 'кот',
+        'крот' and 'ток' for 'кот' with distance 1. Useful for spelling suggestions, use with length or prefix of
+        the word to search faster. Words are found by walking sorted words as trie, skipping all words with too far
+        prefixes
+        :param word: word to compare with
+        :param distance: maximal distance, 1 by default
+        :return: None
+        :raises ValueError if word is empty or distance is negative
+        """
+        if not word:
+            raise ValueError('Word should not be empty')
+        if distance < 0:
+            raise ValueError(f'Distance should not be negative, got {distance}')
+        self._add_conditions(Condition(SIMILAR, (word.lower(), distance)))
+
+    def undo(self) -> None:
+        """
+        Removes conditions added by the last call of letter_at_index_is, starts_with, ends_with, contains,
+        not_contains, anagram_of, made_of or similar_to. Results return to the state before that call without new search
+        :return: None
+        :raises ValueError if there are no added conditions
+        """
+        if not self._marks:
+            raise ValueError('There are no conditions to undo')
+        del self._conditions[self._marks.pop():]
+        while self._snapshots and self._snapshots[-1][0] > len(self._conditions):
+            self._snapshots.pop()
+
+    def fork(self) -> 'Word':
+        """
+        Returns copy of this word with the same conditions and already found results. Conditions of the copy can be
+        added or undone independently, without new search for the current state
+        :return: Word object
+        """
+        # pylint: disable=protected-access
+        word = copy.copy(self)
+        word._conditions = list(self._conditions)
+        word._snapshots = list(self._snapshots)
+        word._marks = list(self._marks)
+        return word
+
     def examples_count(self) -> int:
         """
         Returns number of words, which are matched with all conditions. If there are no conditions yet, then returns
-        count of words in current dictionary
+        count of words in current dictionary. Words itself are not collected, only ids of them are counted
         :return: number of found words (examples)
         """
-        _results = self.examples(limit=-1)
-        return len(_results)
+        return len(self._select())
 
     def _read_all(self, lang: str) -> None:
-        self._cached = read_data_file(lang)
+        dictionary = get_dictionary(lang)
+        self._cached = dictionary.words
+        self._index = dictionary.index(self._engine)
+        self._snapshots = []
+
+    def _get_index(self) -> WordIndex:
+        if self._index is None or self._index.words is not self._cached:
+            self._index = ENGINES[self._engine](self._cached)
+            self._snapshots = []
+        return self._index
+
+    def _add_conditions(self, *conditions: Condition) -> None:
+        self._marks.append(len(self._conditions))
+        self._conditions.extend(conditions)
+
+    def _select(self) -> Sequence[int]:
+        with profiling.timer('word.select'):
+            if not self._cached:
+                self._read_all(self._lang)
+            index = self._get_index()
+            count = len(self._conditions)
+            if not self._snapshots:
+                selected = index.select(self._conditions)
+            else:
+                done, selected = self._snapshots[-1]
+                if done == count:
+                    profiling.count('word.snapshot_hits')
+                    return selected
+                selected = index.narrow(selected, self._conditions[:done], self._conditions[done:])
+            self._snapshots.append((count, selected))
+            return selected
+
+    def _iter_select(self) -> Iterator[int]:
+        if not self._cached:
+            self._read_all(self._lang)
+        index = self._get_index()
+        count = len(self._conditions)
+        if not self._snapshots:
+            found = index.iter_select(self._conditions)
+        else:
+            done, selected = self._snapshots[-1]
+            if done == count:
+                profiling.count('word.snapshot_hits')
+                return iter(selected)
+            found = index.iter_narrow(selected, self._conditions[:done], self._conditions[done:])
+        return self._keep_snapshot(found, tuple(self._conditions))
+
+    def _keep_snapshot(self, found: Generator[int, None, Sequence[int]],
+                       conditions: Tuple[Condition, ...]) -> Iterator[int]:
+        selected = yield from found
+        # conditions can be changed during iteration, then found ids are not a snapshot of current conditions
+        count = len(conditions)
+        if tuple(self._conditions) == conditions and (not self._snapshots or self._snapshots[-1][0] < count):
+            self._snapshots.append((count, selected))
 
     def _apply_all_conditions(self) -> Generator:
-        return (e for e in self._cached if all(condition(e) for condition in self._conditions))
+        selected = self._select()
+        words = self._cached
+        return (words[i] for i in selected)
 
     def _contains(self, letters: Tuple[str], is_contains: bool = True) -> None:
         for letter in letters:
             if len(letter) != 1:
                 raise ValueError(f'Letter should have length 1, got {len(letter)}')
-        for letter in letters:
-            letter = letter.lower()
-            if is_contains:
-                self._conditions.append(lambda w, let=letter: let in w)
-            else:
-                self._conditions.append(lambda w, let=letter: let not in w)
+        kind = CONTAINS if is_contains else NOT_CONTAINS
+        self._add_conditions(*(Condition(kind, letter.lower()) for letter in letters))
 
     def _starts_ends(self, fix: str, is_starts: bool = True) -> None:
         fix_name = 'Prefix' if is_starts else 'Postfix'
@@ -112,7 +352,4 @@ class Word:
             raise ValueError(f'{fix_name} {fix} is bigger than word length({self._length})')
         if fix:
             fix = fix.lower()
-            if is_starts:
-                self._conditions.append(lambda w: w.startswith(fix))
-            else:
-                self._conditions.append(lambda w: w.endswith(fix))
+            self._add_conditions(Condition(PREFIX if is_starts else SUFFIX, fix))
@@ -0,0 +1,50 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase, main
+
+from src.chumba.aio import AsyncStatistics, statistics_from_files
+from src.chumba.statistic import Statistics
+from tests.test_statistics import TEXT, TEXT_SMALL
+
+
+class TestAsyncStatistics(TestCase):
+    def test_texts_and_streams(self):
+        async def ingest():
+            ingestion = AsyncStatistics(concurrency=2)
+            stream = asyncio.StreamReader()
+            data = TEXT.encode('utf-8')
+            for i in range(0, len(data), 7):
+                stream.feed_data(data[i:i + 7])
+            stream.feed_eof()
+            await asyncio.gather(ingestion.add_texts([TEXT_SMALL, TEXT_SMALL]),
+                                 ingestion.add_stream(stream, chunk_size=5))
+            return ingestion.statistics
+
+        stat = asyncio.run(ingest())
+        expected = Statistics(TEXT + TEXT_SMALL + TEXT_SMALL)
+        self.assertIsNone(stat.words)
+        self.assertEqual(expected.counter, stat.counter)
+        self.assertEqual(expected.words_count, stat.words_count)
+
+    def test_files_in_processes(self):
+        with tempfile.TemporaryDirectory() as folder:
+            paths = []
+            for i, text in enumerate((TEXT_SMALL, TEXT, TEXT_SMALL)):
+                paths.append(os.path.join(folder, f'{i}.txt'))
+                with open(paths[-1], 'w', encoding='utf-8') as file:
+                    file.write(text)
+            with ProcessPoolExecutor(2) as executor:
+                stat = asyncio.run(statistics_from_files(paths, executor=executor, ignored=''))
+        expected = Statistics(TEXT_SMALL + TEXT + TEXT_SMALL, ignored='')
+        self.assertEqual(expected.counter, stat.counter)
+        self.assertEqual(expected.words_count, stat.words_count)
+
+    def test_wrong_concurrency(self):
+        with self.assertRaises(ValueError):
+            AsyncStatistics(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+import os
+import tempfile
+from array import array
+from threading import Thread
+from unittest import TestCase, main
+
+from src.chumba.conditions import parse_pattern
+from src.chumba.dictionary import (CACHE_SUFFIX, Dictionary, _REGISTRY, get_dictionary, has_dictionary,
+                                   load_dictionary, preload, register_dictionary)
+from src.chumba.storage import write_sections
+from src.chumba.utils import read_data_file
+from src.chumba.word import Word
+
+
+class TestDictionary(TestCase):
+    def test_dictionary_is_read_only_once(self):
+        self.assertIs(get_dictionary('ru'), get_dictionary('ru'))
+        self.assertIsNot(get_dictionary('ru'), get_dictionary('en'))
+
+    def test_dictionary_has_same_words_as_file(self):
+        for lang in ('ru', 'en'):
+            with self.subTest(f'Test dictionary {lang}'):
+                self.assertEqual(tuple(read_data_file(lang)), get_dictionary(lang).words)
+
+    def test_words_are_shared_between_word_objects(self):
+        first, second = Word(5), Word(7)
+        first.examples(1)
+        second.examples(1)
+        self.assertIs(first._cached, second._cached)
+        self.assertIs(get_dictionary('ru').words, first._cached)
+
+    def test_same_dictionary_from_threads(self):
+        results = []
+        threads = [Thread(target=lambda: results.append(get_dictionary('en'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(8, len(results))
+        self.assertTrue(all(e is results[0] for e in results))
+
+    def test_preload(self):
+        preload()
+        self.assertEqual(37198, len(get_dictionary('ru')))
+        self.assertEqual(30880, len(get_dictionary('en')))
+
+    def test_custom_dictionary(self):
+        dictionary = Dictionary('test', ['a', 'b'])
+        self.assertEqual(('a', 'b'), dictionary.words)
+        self.assertEqual('b', dictionary[1])
+        self.assertEqual(['a', 'b'], list(dictionary))
+        self.assertEqual('Dictionary test: words count=2', repr(dictionary))
+
+    def test_vocabulary_is_shared(self):
+        dictionary = get_dictionary('en')
+        self.assertIs(dictionary.vocabulary(), dictionary.vocabulary())
+        self.assertEqual(set(dictionary.words), dictionary.vocabulary())
+
+    def test_save_and_load(self):
+        dictionary = get_dictionary('ru')
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'ru.bin')
+            dictionary.save(path)
+            loaded = Dictionary.load(path)
+            self.assertEqual('ru', loaded.name)
+            self.assertEqual(dictionary.words, loaded.words)
+            self.assertEqual(list(dictionary.index().masks()), list(loaded.index().masks()))
+            for pattern in ('ма*', '*ция', 'к?т*', '__ш__', '*а*б*'):
+                with self.subTest(f'Test pattern {pattern}'):
+                    conditions = parse_pattern(pattern)
+                    self.assertEqual(dictionary.index().select(conditions), loaded.index().select(conditions))
+            with self.assertRaises(ValueError):
+                Dictionary('test', ['a\nb']).save(path)
+
+    def test_load_corrupted_dictionary(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'test.bin')
+            for sections in ({'name': b'test', 'words': b'a\nb', 'masks': array('Q', [1]),
+                              'prefixes': array('I', [0, 1]), 'suffixes': array('I', [0, 1])},
+                             {'name': b'test', 'words': b'a\nb'}):
+                with self.subTest(f'Test sections {list(sections)}'):
+                    write_sections(path, 'dict', sections)
+                    with self.assertRaises(ValueError):
+                        Dictionary.load(path)
+
+    def test_load_dictionary(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'test.bin')
+            Dictionary('test', ['кот', 'кит']).save(path)
+            try:
+                dictionary = load_dictionary(path)
+                self.assertIs(dictionary, get_dictionary('test'))
+                self.assertEqual(('кот', 'кит'), dictionary.words)
+            finally:
+                _REGISTRY.pop('test', None)
+
+    def test_register_dictionary(self):
+        try:
+            dictionary = register_dictionary('test', iter(['кот', 'кит']))
+            self.assertIs(dictionary, get_dictionary('test'))
+            self.assertTrue(has_dictionary('test'))
+            self.assertEqual(['кит'], Word.pattern('ки?', dictionary='test').examples())
+        finally:
+            _REGISTRY.pop('test', None)
+        self.assertFalse(has_dictionary('test'))
+        self.assertTrue(has_dictionary('en'))
+        with self.assertRaises(ValueError):
+            Word(dictionary='test')
+
+    def test_register_dictionary_lowers_words(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'words.txt')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('Apple\napple\nBerlin\n')
+            for source in (['Apple', 'apple', 'Berlin'], path):
+                with self.subTest(f'Test source {source}'):
+                    try:
+                        dictionary = register_dictionary('test', source)
+                        self.assertEqual(('apple', 'apple', 'berlin'), dictionary.words)
+                        word = Word(dictionary='test')
+                        word.starts_with('A')
+                        self.assertEqual(['apple', 'apple'], word.examples(-1))
+                        word = Word(dictionary='test')
+                        word.contains('B')
+                        self.assertEqual(['berlin'], word.examples(-1))
+                    finally:
+                        _REGISTRY.pop('test', None)
+            self.assertEqual(('apple', 'apple', 'berlin'), Dictionary.load(path + CACHE_SUFFIX, source=path).words)
+
+    def test_register_dictionary_from_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'words.txt')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('кот\n\n  кит \nток\n')
+            try:
+                first = register_dictionary('test', path)
+                self.assertTrue(os.path.exists(path + CACHE_SUFFIX))
+                self.assertEqual(('кот', 'кит', 'ток'), first.words)
+                self.assertEqual({}, first._data)
+                second = register_dictionary('other', path)
+                self.assertEqual(first.words, second.words)
+                self.assertEqual('other', second.name)
+                self.assertEqual(['кот', 'ток'], Word.pattern('*о*', dictionary='other').examples())
+                with open(path, 'a', encoding='utf-8') as file:
+                    file.write('кто')
+                third = register_dictionary('test', path)
+                self.assertEqual(('кот', 'кит', 'ток', 'кто'), third.words)
+                self.assertEqual({}, third._data)
+                self.assertEqual(third.words, Dictionary.load(path + CACHE_SUFFIX, source=path).words)
+            finally:
+                _REGISTRY.pop('test', None)
+                _REGISTRY.pop('other', None)
+
+    def test_register_dictionary_with_corrupted_cache(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'words.txt')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('кот\nкит\nток\n')
+            try:
+                register_dictionary('test', path)
+                with open(path + CACHE_SUFFIX, 'rb') as file:
+                    content = file.read()
+                for corrupted in (content[:-4], content[:40], content[:20], b'garbage'):
+                    with self.subTest(f'Test cache of {len(corrupted)} bytes'):
+                        with open(path + CACHE_SUFFIX, 'wb') as file:
+                            file.write(corrupted)
+                        dictionary = register_dictionary('test', path)
+                        self.assertEqual(('кот', 'кит', 'ток'), dictionary.words)
+                        self.assertEqual(['кот', 'ток'], Word.pattern('*о*', dictionary='test').examples())
+                        self.assertEqual(dictionary.words, Dictionary.load(path + CACHE_SUFFIX, source=path).words)
+            finally:
+                _REGISTRY.pop('test', None)
+
+
+if __name__ == '__main__':
+    main()
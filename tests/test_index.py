@@ -0,0 +1,178 @@
+from array import array
+from unittest import TestCase, main, skipIf
+
+from src.chumba.conditions import (Condition, LENGTH, LETTER, PREFIX, SUFFIX, CONTAINS, NOT_CONTAINS, ANAGRAM,
+                                   SUB_ANAGRAM, SIMILAR, edit_distance)
+from src.chumba.index import WordIndex, letters_mask, numpy
+from src.chumba.matrix import MatrixIndex
+from src.chumba.utils import Lang
+
+WORDS = ['ёкать', 'ёмкий', 'аббат', 'абзац', 'агнец', 'а', 'аз', 'амортизация', 'кот', 'кит']
+
+
+class TestIndex(TestCase):
+    def test_condition_is_callable(self):
+        params = (
+            (True, Condition(LENGTH, 3), 'кот'),
+            (False, Condition(LENGTH, 2), 'кот'),
+            (True, Condition(LETTER, (1, 'о')), 'кот'),
+            (False, Condition(LETTER, (5, 'о')), 'кот'),
+            (True, Condition(PREFIX, 'ко'), 'кот'),
+            (True, Condition(SUFFIX, 'от'), 'кот'),
+            (True, Condition(CONTAINS, 'т'), 'кот'),
+            (False, Condition(NOT_CONTAINS, 'т'), 'кот'),
+            (True, Condition(ANAGRAM, 'кот'), 'ток'),
+            (False, Condition(ANAGRAM, 'кот'), 'кто-'),
+            (True, Condition(SUB_ANAGRAM, 'кооот'), 'кот'),
+            (False, Condition(SUB_ANAGRAM, 'кот'), 'коот'),
+            (True, Condition(SIMILAR, ('кто', 2)), 'кот'),
+            (False, Condition(SIMILAR, ('кто', 1)), 'кот'),
+        )
+        for expected, condition, word in params:
+            with self.subTest(f'Test condition {condition}'):
+                self.assertEqual(expected, condition(word))
+
+    def test_select(self):
+        params = (
+            (list(range(len(WORDS))), []),
+            ([8, 9], [Condition(LENGTH, 3)]),
+            ([2, 3, 4], [Condition(LENGTH, 5), Condition(PREFIX, 'а')]),
+            ([3, 4], [Condition(LENGTH, 5), Condition(SUFFIX, 'ц')]),
+            ([4], [Condition(LENGTH, 5), Condition(SUFFIX, 'ц'), Condition(LETTER, (1, 'г'))]),
+            ([], [Condition(LENGTH, 5), Condition(PREFIX, 'а'), Condition(LETTER, (0, 'б'))]),
+            ([], [Condition(LENGTH, 2), Condition(PREFIX, 'абв')]),
+            ([7], [Condition(PREFIX, 'а'), Condition(SUFFIX, 'я')]),
+            ([7], [Condition(LETTER, (1, 'м')), Condition(CONTAINS, 'з')]),
+            ([3, 6, 7], [Condition(PREFIX, 'а'), Condition(CONTAINS, 'з')]),
+            ([4, 5, 6], [Condition(PREFIX, 'а'), Condition(NOT_CONTAINS, 'б'), Condition(NOT_CONTAINS, 'т')]),
+            ([], [Condition(CONTAINS, 'w')]),
+            ([], [Condition(CONTAINS, 'т'), Condition(NOT_CONTAINS, 'т')]),
+            ([8, 9], [Condition(LENGTH, 3), Condition(NOT_CONTAINS, 'w')]),
+            ([2, 3], [Condition(LETTER, (0, 'а')), Condition(LETTER, (1, 'б'))]),
+            ([3], [Condition(LETTER, (0, 'а')), Condition(LETTER, (1, 'б')), Condition(LETTER, (2, 'з'))]),
+        )
+        index = WordIndex(WORDS)
+        for expected, conditions in params:
+            with self.subTest(f'Test select {conditions}'):
+                self.assertEqual(expected, list(index.select(conditions)))
+
+    def test_precomputed_data(self):
+        index = WordIndex(WORDS)
+        masks, orders = index.masks(), index.orders()
+        self.assertEqual([5, 2, 3, 4, 6, 7, 9, 8, 0, 1], list(orders[0]))
+        loaded = WordIndex(WORDS, memoryview(masks), tuple(memoryview(array('I', e)) for e in orders))
+        for conditions in ([Condition(SUFFIX, 'ц')], [Condition(PREFIX, 'аб'), Condition(CONTAINS, 'з')]):
+            with self.subTest(f'Test select {conditions}'):
+                self.assertEqual(index.select(conditions), loaded.select(conditions))
+
+    def test_letters_mask(self):
+        self.assertEqual(0, letters_mask(''))
+        self.assertEqual(1, letters_mask('а'))
+        self.assertEqual(letters_mask('аб'), letters_mask('баба'))
+        self.assertEqual(1 << len(Lang.RU.alphabet), letters_mask('a'))
+        self.assertEqual(1 << 63, letters_mask('-'))
+        self.assertEqual(1 << 63, letters_mask('-é'))
+        self.assertLess(letters_mask('ёжz-'), 1 << 64)
+
+    def test_select_with_other_symbols(self):
+        words = ['a-bomb', 'abbé', 'abbey', 'a']
+        params = (
+            ([0], [Condition(CONTAINS, '-')]),
+            ([1], [Condition(CONTAINS, 'é')]),
+            ([], [Condition(CONTAINS, 'é'), Condition(CONTAINS, '-')]),
+            ([2, 3], [Condition(NOT_CONTAINS, '-'), Condition(NOT_CONTAINS, 'é')]),
+            ([1, 2, 3], [Condition(NOT_CONTAINS, '-')]),
+        )
+        index = WordIndex(words)
+        for expected, conditions in params:
+            with self.subTest(f'Test select {conditions}'):
+                self.assertEqual(expected, list(index.select(conditions)))
+
+    def test_select_anagrams(self):
+        params = (
+            ([8], [Condition(ANAGRAM, 'кот')]),
+            ([], [Condition(ANAGRAM, 'кот'), Condition(LENGTH, 4)]),
+            ([], [Condition(ANAGRAM, 'кот'), Condition(ANAGRAM, 'ikt')]),
+            ([9], [Condition(ANAGRAM, 'икт'), Condition(PREFIX, 'к')]),
+            ([8], [Condition(SUB_ANAGRAM, 'кот')]),
+            ([5, 6], [Condition(SUB_ANAGRAM, 'ааз')]),
+            ([6], [Condition(SUB_ANAGRAM, 'ааз'), Condition(LENGTH, 2)]),
+            ([5, 8, 9], [Condition(SUB_ANAGRAM, 'аикот')]),
+            ([8, 9], [Condition(SUB_ANAGRAM, 'аикот'), Condition(PREFIX, 'к')]),
+            ([8], [Condition(SUB_ANAGRAM, 'аикот'), Condition(SUB_ANAGRAM, 'кот')]),
+            ([], [Condition(SUB_ANAGRAM, 'аикот'), Condition(CONTAINS, 'б')]),
+        )
+        index = WordIndex(WORDS)
+        for expected, conditions in params:
+            with self.subTest(f'Test select {conditions}'):
+                self.assertEqual(expected, list(index.select(conditions)))
+                self.assertEqual([i for i, w in enumerate(WORDS) if all(c(w) for c in conditions)], expected)
+
+    def test_edit_distance(self):
+        params = (
+            (0, '', ''),
+            (3, 'кот', ''),
+            (3, '', 'кот'),
+            (0, 'кот', 'кот'),
+            (1, 'кот', 'крот'),
+            (2, 'кот', 'ток'),
+            (3, 'kitten', 'sitting'),
+        )
+        for expected, first, second in params:
+            with self.subTest(f'Test distance {first} {second}'):
+                self.assertEqual(expected, edit_distance(first, second))
+                self.assertEqual(expected, edit_distance(second, first))
+
+    def test_select_similar(self):
+        words = WORDS + ['крот', 'код', 'ток', 'котик', 'скот', 'абзацы']
+        params = (
+            ([8], [Condition(SIMILAR, ('кот', 0))]),
+            ([8, 9, 10, 11, 14], [Condition(SIMILAR, ('кот', 1))]),
+            ([8, 9, 10, 11, 12, 13, 14], [Condition(SIMILAR, ('кот', 2))]),
+            ([9], [Condition(SIMILAR, ('кот', 1)), Condition(PREFIX, 'к'), Condition(NOT_CONTAINS, 'о')]),
+            ([10], [Condition(SIMILAR, ('кот', 1)), Condition(LETTER, (0, 'к')), Condition(LETTER, (1, 'р'))]),
+            ([8, 9, 11], [Condition(SIMILAR, ('кот', 1)), Condition(LENGTH, 3)]),
+            ([3, 15], [Condition(SIMILAR, ('абзац', 1)), Condition(PREFIX, 'аб')]),
+            ([], [Condition(SIMILAR, ('кот', 1)), Condition(LENGTH, 7)]),
+        )
+        index = WordIndex(words)
+        for expected, conditions in params:
+            with self.subTest(f'Test select {conditions}'):
+                self.assertEqual(expected, list(index.select(conditions)))
+                self.assertEqual([i for i, w in enumerate(words) if all(c(w) for c in conditions)], expected)
+
+    def test_select_is_same_as_conditions(self):
+        index = WordIndex(WORDS)
+        conditions = [Condition(PREFIX, 'а'), Condition(NOT_CONTAINS, 'ц'), Condition(LETTER, (1, 'б'))]
+        expected = [i for i, w in enumerate(WORDS) if all(c(w) for c in conditions)]
+        self.assertEqual(expected, list(index.select(conditions)))
+
+
+@skipIf(numpy is None, 'NumPy is not installed')
+class TestMatrixIndex(TestCase):
+    def test_select_is_same_as_word_index(self):
+        conditions = (
+            [],
+            [Condition(LENGTH, 5)],
+            [Condition(LENGTH, 5), Condition(PREFIX, 'аб'), Condition(SUFFIX, 'ц')],
+            [Condition(LENGTH, 5), Condition(LETTER, (1, 'б')), Condition(NOT_CONTAINS, 'т')],
+            [Condition(LENGTH, 4)],
+            [Condition(PREFIX, 'а'), Condition(SUFFIX, 'я')],
+            [Condition(LETTER, (1, 'м')), Condition(CONTAINS, 'з')],
+            [Condition(LETTER, (20, 'м'))],
+            [Condition(SUFFIX, 'ц'), Condition(CONTAINS, '-')],
+            [Condition(ANAGRAM, 'кот')],
+            [Condition(SUB_ANAGRAM, 'аикот'), Condition(PREFIX, 'к')],
+            [Condition(SIMILAR, ('кот', 1)), Condition(LENGTH, 3)],
+        )
+        index, matrix = WordIndex(WORDS), MatrixIndex(WORDS)
+        for condition in conditions:
+            with self.subTest(f'Test select {condition}'):
+                self.assertEqual(list(index.select(condition)), list(matrix.select(condition)))
+
+    def test_select_on_empty_words(self):
+        self.assertEqual((), MatrixIndex([]).select([Condition(LETTER, (1, 'м'))]))
+
+
+if __name__ == '__main__':
+    main()
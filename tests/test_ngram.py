@@ -0,0 +1,60 @@
+from collections import Counter
+from unittest import TestCase, main
+
+from src.chumba.ngram import CooccurrenceStatistics, NgramStatistics
+
+TEXT = 'На мели мы налима лениво ловили, на мели мы налима ловили. Мы на мели!'
+
+
+class TestNgramStatistics(TestCase):
+    def test_bigrams(self):
+        stat = NgramStatistics(TEXT)
+        self.assertEqual(13, stat.grams_count)
+        self.assertEqual([(('на', 'мели'), 3), (('мели', 'мы'), 2), (('мы', 'налима'), 2)], stat.most_common(3))
+        self.assertEqual(3, stat.count('НА', 'мели'))
+        self.assertEqual(0, stat.count('мели', 'на'))
+        self.assertEqual(0, stat.count('нет', 'мели'))
+        self.assertEqual(0, stat.max_error())
+        with self.assertRaises(ValueError):
+            stat.count('на')
+
+    def test_trigrams_and_update(self):
+        stat = NgramStatistics('а б в г', n=3)
+        stat.update('б в г')
+        self.assertEqual([(('б', 'в', 'г'), 2), (('а', 'б', 'в'), 1)], stat.most_common())
+        self.assertEqual(3, stat.grams_count)
+        self.assertEqual([(('а',), 1)], NgramStatistics('а', n=1).most_common())
+        with self.assertRaises(ValueError):
+            NgramStatistics(n=0)
+
+    def test_approximate(self):
+        words = [f'w{i % 50}' for i in range(1000)] + ['a', 'b'] * 300
+        exact, stat = NgramStatistics(), NgramStatistics(capacity=20)
+        for i in range(0, len(words), 100):
+            exact.update(' '.join(words[i:i + 100]))
+            stat.update(' '.join(words[i:i + 100]))
+        self.assertEqual(exact.grams_count, stat.grams_count)
+        self.assertTrue(stat.is_approximate)
+        self.assertEqual({('a', 'b'), ('b', 'a')}, {gram for gram, _ in stat.most_common(2)})
+        for gram, count in exact.most_common():
+            with self.subTest(f'Test count of {gram}'):
+                self.assertLessEqual(count, stat.count(*gram))
+        for gram, count in stat.most_common():
+            with self.subTest(f'Test error of {gram}'):
+                self.assertLessEqual(count - stat.max_error(), exact.count(*gram))
+
+
+class TestCooccurrenceStatistics(TestCase):
+    def test_window(self):
+        stat = CooccurrenceStatistics('а б а в', window=3)
+        expected = Counter({('а', 'б'): 2, ('а', 'в'): 1, ('б', 'в'): 1})
+        self.assertEqual(expected, Counter(dict(stat.most_common())))
+        self.assertEqual(2, stat.count('б', 'а'))
+        self.assertEqual(0, stat.count('а', 'а'))
+        self.assertEqual(4, stat.grams_count)
+        with self.assertRaises(ValueError):
+            CooccurrenceStatistics(window=1)
+
+
+if __name__ == '__main__':
+    main()
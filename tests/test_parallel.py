@@ -0,0 +1,43 @@
+import os
+import tempfile
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from src.chumba import parallel
+from src.chumba.parallel import statistics_from_files, statistics_from_texts
+from src.chumba.statistic import Statistics
+from tests.test_statistics import TEXT, TEXT_SMALL
+
+
+class TestParallel(TestCase):
+    def test_from_texts(self):
+        expected = Statistics(TEXT + TEXT_SMALL + TEXT)
+        stat = statistics_from_texts([TEXT, TEXT_SMALL, TEXT], processes=2)
+        self.assertIsNone(stat.words)
+        self.assertEqual(expected.counter, stat.counter)
+        self.assertEqual(str(expected), str(stat))
+
+    def test_from_texts_with_shards(self):
+        expected = Statistics(TEXT)
+        with patch.object(parallel, 'SHARD_SIZE', 100):
+            self.assertGreater(len(list(parallel._shards(TEXT))), 10)
+            self.assertEqual(TEXT, ''.join(parallel._shards(TEXT)))
+            stat = statistics_from_texts([TEXT], processes=1)
+        self.assertEqual(str(expected), str(stat))
+
+    def test_from_files(self):
+        with tempfile.TemporaryDirectory() as folder:
+            paths = []
+            for i, text in enumerate((TEXT_SMALL, TEXT, TEXT_SMALL)):
+                paths.append(os.path.join(folder, f'{i}.txt'))
+                with open(paths[-1], 'w', encoding='utf-8') as file:
+                    file.write(text)
+            stat = statistics_from_files(paths, processes=2, ignored='')
+        self.assertEqual(str(Statistics(TEXT_SMALL + TEXT + TEXT_SMALL, ignored='')), str(stat))
+
+    def test_empty(self):
+        self.assertEqual(0, statistics_from_texts([]).words_count)
+
+
+if __name__ == '__main__':
+    main()
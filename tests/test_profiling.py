@@ -0,0 +1,81 @@
+import json
+from unittest import TestCase, main
+
+from src.chumba import profiling
+from src.chumba.profiling import Profile
+from src.chumba.statistic import Statistics
+from src.chumba.utils import read_data_file
+from src.chumba.word import Word
+
+
+class TestProfiling(TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_profile(self):
+        collected = Profile()
+        collected.add_time('phase', 0.5)
+        collected.add_time('phase', 1.5)
+        collected.count('counter')
+        collected.count('counter', 4)
+        expected = {'timers': {'phase': {'calls': 2, 'total': 2.0, 'max': 1.5}}, 'counters': {'counter': 5}}
+        self.assertEqual(expected, collected.snapshot())
+        self.assertEqual('Profile: timers=1, counters=1', repr(collected))
+        collected.reset()
+        self.assertEqual({'timers': {}, 'counters': {}}, collected.snapshot())
+
+    def test_disabled_by_default(self):
+        self.assertFalse(profiling.is_enabled())
+        self.assertIs(profiling.timer('a'), profiling.timer('b'))
+        Word(5).examples()
+        self.assertEqual({'timers': {}, 'counters': {}}, profiling.snapshot())
+
+    def test_profile_of_call(self):
+        with profiling.profile() as collected:
+            self.assertTrue(profiling.is_enabled())
+            word = Word(5, is_ru=False)
+            word.starts_with('b')
+            word.examples()
+            word.examples()
+            word.ends_with('s')
+            word.examples()
+            Statistics('a b, c', keep_words=False)
+        self.assertFalse(profiling.is_enabled())
+        snapshot = collected.snapshot()
+        self.assertEqual(3, snapshot['timers']['word.select']['calls'])
+        self.assertEqual(1, snapshot['timers']['statistics.count']['calls'])
+        counters = snapshot['counters']
+        self.assertEqual(1, counters['word.snapshot_hits'])
+        self.assertEqual(3, counters['statistics.words'])
+        self.assertLessEqual(counters['index.matched'], counters['index.scanned'])
+        self.assertEqual(snapshot, json.loads(json.dumps(snapshot)))
+        self.assertEqual({'timers': {}, 'counters': {}}, profiling.snapshot())
+
+    def test_cache_hits(self):
+        with profiling.profile() as collected:
+            for _ in range(3):
+                word = Word(6)
+                word.contains('ю', 'я')
+                word.examples()
+        counters = collected.snapshot()['counters']
+        self.assertEqual((1, 2), (counters['index.cache_misses'], counters['index.cache_hits']))
+
+    def test_enable_for_process(self):
+        collected = profiling.enable()
+        self.assertIs(collected, profiling.enable())
+        read_data_file('en')
+        with profiling.profile() as block:
+            Statistics('a b')
+        snapshot = profiling.snapshot()
+        self.assertEqual(30880, snapshot['counters']['dictionary.words'])
+        self.assertEqual(2, snapshot['counters']['statistics.words'])
+        self.assertEqual({'statistics.words': 2}, block.snapshot()['counters'])
+        profiling.reset()
+        self.assertTrue(profiling.is_enabled())
+        self.assertEqual({'timers': {}, 'counters': {}}, profiling.snapshot())
+        profiling.disable()
+        self.assertFalse(profiling.is_enabled())
+
+
+if __name__ == '__main__':
+    main()
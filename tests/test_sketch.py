@@ -0,0 +1,66 @@
+from collections import Counter
+from random import Random
+from unittest import TestCase, main
+
+from src.chumba.sketch import BloomFilter, CountMinSketch, HyperLogLog, SpaceSaving
+
+
+class TestSketch(TestCase):
+    def setUp(self):
+        rand = Random(1)
+        self.keys = [int(rand.paretovariate(1.2)) for _ in range(5000)]
+        self.counter = Counter(self.keys)
+
+    def test_count_min_sketch(self):
+        sketch = CountMinSketch(width=100)
+        for key in self.keys:
+            sketch.add(key)
+        self.assertEqual(len(self.keys), sketch.total)
+        for key, count in self.counter.items():
+            with self.subTest(f'Test estimate of {key}'):
+                self.assertLessEqual(count, sketch.estimate(key))
+                self.assertLessEqual(sketch.estimate(key), count + sketch.epsilon * sketch.total)
+        with self.assertRaises(ValueError):
+            CountMinSketch(width=0)
+
+    def test_space_saving(self):
+        top = SpaceSaving(10)
+        for key in self.keys:
+            top.add(key)
+        self.assertEqual(10, len(top.counts))
+        self.assertEqual([e for e, _ in self.counter.most_common(3)], [e for e, _ in top.most_common(3)])
+        for key, count in top.most_common():
+            with self.subTest(f'Test count of {key}'):
+                self.assertLessEqual(self.counter[key], count)
+                self.assertLessEqual(count - top.errors[key], self.counter[key])
+                self.assertLessEqual(top.errors[key], top.minimum())
+        self.assertLessEqual(top.minimum(), len(self.keys) / 10)
+        with self.assertRaises(ValueError):
+            SpaceSaving(0)
+
+    def test_hyper_log_log(self):
+        params = (0, 1, 100, 10000)
+        for count in params:
+            with self.subTest(f'Test count of {count} keys'):
+                counter = HyperLogLog()
+                for key in range(count):
+                    counter.add(key)
+                    counter.add(key)
+                self.assertLessEqual(abs(counter.count() - count), 3 * counter.error * count)
+        with self.assertRaises(ValueError):
+            HyperLogLog(20)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter.from_keys(range(0, 20000, 2), 10000, error=0.01)
+        self.assertTrue(all(key in bloom for key in range(0, 20000, 2)))
+        errors = sum(key in bloom for key in range(1, 20000, 2))
+        self.assertLess(errors, 10000 * 0.02)
+        self.assertEqual(7, bloom.hashes)
+        for capacity, error in ((0, 0.01), (10, 0), (10, 1)):
+            with self.subTest(f'Test filter of {capacity} with error {error}'):
+                with self.assertRaises(ValueError):
+                    BloomFilter(capacity, error)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,14 @@
-from src.chumba.statistic import Statistics
+import os
+import random
+import tempfile
+from array import array
+from collections import Counter
+from io import StringIO
+from src.chumba.dictionary import get_dictionary
+from src.chumba.sketch import BloomFilter
+from src.chumba.statistic import ApproximateStatistics, Statistics, WindowedStatistics
+from src.chumba.storage import write_sections
+from src.chumba.tokenizer import Tokenizer
 from unittest import TestCase, main
 
 TEXT = """
@@ -112,6 +122,258 @@ class TestStatistics(TestCase):
                 result = stat.words_with_length(length, limit=limit)
                 self.assertEqual(expected, result)
 
+    def test_ignored_is_set_of_words(self):
+        stat = Statistics('12 1 2 -1 - a A b', ignored='-12A')
+        self.assertEqual(['12', '-1', 'b'], stat.words)
+        self.assertEqual(3, stat.words_count)
+        stream = Statistics.from_stream(['12 1 2 -1 - a A b'], ignored='-12A')
+        self.assertEqual(stat.counter, stream.counter)
+        self.assertEqual(3, stream.words_count)
+
+    def test_custom_tokenizer(self):
+        tokenizer = Tokenizer(symbols=r'\w', ignored=['на'])
+        stat = Statistics('На мели-мели мы налима', tokenizer=tokenizer)
+        self.assertEqual(['мели', 'мели', 'мы', 'налима'], stat.words)
+        stream = Statistics.from_stream(['На ме', 'ли-мели мы на', 'лима'], tokenizer=tokenizer)
+        self.assertEqual(stat.counter, stream.counter)
+
+    def test_lean(self):
+        expected = Statistics(TEXT)
+        stat = Statistics(TEXT, keep_words=False)
+        self.assertIsNone(stat.words)
+        self.assertFalse(hasattr(stat, '__dict__'))
+        self.assertEqual(expected.counter, stat.counter)
+        self.assertEqual(str(expected), str(stat))
+        self.assertIsInstance(expected.unique_words, list)
+        self.assertEqual(expected.unique_words, list(stat.unique_words))
+        stat.counter['новое'] += 1
+        self.assertIn('новое', stat.unique_words)
+        self.assertEqual(262, stat.unique_words_count)
+
+    def test_lean_context_letters(self):
+        for text in ('ΑΣ.Β', 'ΟΔΟΣ ΟΔΟΣ', 'İs IS'):
+            with self.subTest(f'Test lean counting of {text}'):
+                self.assertEqual(Statistics(text).counter, Statistics(text, keep_words=False).counter)
+                self.assertEqual(Statistics(text).counter, Statistics.from_stream([text]).counter)
+
+    def test_from_stream_chunks(self):
+        expected = Statistics(TEXT)
+        for size in (1, 2, 7, 100, 10000):
+            with self.subTest(f'Test chunks of size {size}'):
+                chunks = (TEXT[i:i + size] for i in range(0, len(TEXT), size))
+                stat = Statistics.from_stream(chunks)
+                self.assertIsNone(stat.words)
+                self.assertEqual(expected.counter, stat.counter)
+                self.assertEqual(str(expected), str(stat))
+
+    def test_from_stream_file(self):
+        expected = Statistics(TEXT_SMALL, ignored='')
+        stat = Statistics.from_stream(StringIO(TEXT_SMALL), ignored='', chunk_size=5)
+        self.assertEqual(str(expected), str(stat))
+        self.assertEqual(MOST_COMMON, stat.most_common())
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'text.txt')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(TEXT)
+            stat = Statistics.from_stream(path, chunk_size=3)
+        self.assertEqual(str(Statistics(TEXT)), str(stat))
+
+    def test_frequency_index_is_built_once(self):
+        stat = Statistics(TEXT_SMALL)
+        self.assertIsNone(stat._index)
+        self.assertEqual([], stat.words_with_count(100))
+        index = stat._index
+        self.assertEqual(['на', 'мы'], stat.words_with_length(2, limit=2))
+        self.assertEqual(LESS_COMMON[:2], stat.less_common(2))
+        self.assertIs(index, stat._index)
+        self.assertEqual([2, 1], sorted(index.by_count, reverse=True))
+
+    def test_merge(self):
+        first, second = Statistics(TEXT), Statistics(TEXT_SMALL)
+        expected = Statistics(TEXT + TEXT_SMALL)
+        for stat in (first.merge(second), first + second):
+            with self.subTest('Test merge'):
+                self.assertEqual(expected.words, stat.words)
+                self.assertEqual(expected.counter, stat.counter)
+                self.assertEqual(str(expected), str(stat))
+        self.assertEqual(426, first.words_count)
+        self.assertEqual(str(expected + expected), str(first.merge(second, first, second)))
+
+    def test_merge_without_words(self):
+        stat = Statistics(TEXT_SMALL) + Statistics.from_stream([TEXT_SMALL])
+        self.assertIsNone(stat.words)
+        self.assertEqual(2 * Statistics(TEXT_SMALL).words_count, stat.words_count)
+
+    def test_save_and_load(self):
+        for stat in (Statistics(TEXT), Statistics(''), Statistics.from_stream([TEXT_SMALL])):
+            with self.subTest(f'Test save {stat}'):
+                with tempfile.TemporaryDirectory() as folder:
+                    path = os.path.join(folder, 'stat.bin')
+                    stat.save(path)
+                    loaded = Statistics.load(path)
+                self.assertIsNone(loaded.words)
+                self.assertEqual(list(stat.counter.items()), list(loaded.counter.items()))
+                self.assertEqual(str(stat), str(loaded))
+                loaded.update(TEXT_SMALL)
+                self.assertEqual(stat.words_count + 26, loaded.words_count)
+
+    def test_load_corrupted(self):
+        params = (
+            {'totals': array('Q', [5, 3]), 'counts': array('Q', [1]), 'words': b'a\nb\nc'},
+            {'totals': array('Q', [5, 1]), 'counts': array('Q', [1, 2]), 'words': b'a\nb'},
+            {'totals': array('Q', [5, 2]), 'counts': array('Q', [1, 2])},
+            {'counts': array('Q', [1]), 'words': b'a'},
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'stat.bin')
+            for sections in params:
+                with self.subTest(f'Test sections {sections}'):
+                    write_sections(path, 'stats', sections)
+                    with self.assertRaises(ValueError):
+                        Statistics.load(path)
+
+    def test_update_and_subtract(self):
+        expected = Statistics(TEXT + TEXT_SMALL)
+        for keep_words in (True, False):
+            with self.subTest(f'Test update with keep_words={keep_words}'):
+                stat = Statistics(TEXT, keep_words=keep_words)
+                stat.most_common()
+                stat.update(TEXT_SMALL)
+                self.assertEqual(expected.words if keep_words else None, stat.words)
+                self.assertEqual(str(expected), str(stat))
+                self.assertEqual(expected.most_common(), stat.most_common())
+                self.assertEqual(expected.less_common(), stat.less_common())
+                self.assertEqual(expected.words_with_count(2), stat.words_with_count(2))
+                self.assertEqual(expected.words_with_length(4), stat.words_with_length(4))
+                stat.subtract(Statistics(TEXT))
+                self.assertIsNone(stat.words)
+                self.assertEqual(Statistics(TEXT_SMALL).counter, stat.counter)
+                self.assertEqual((26, 22), (stat.words_count, stat.unique_words_count))
+                self.assertEqual(stat.counter.most_common(), stat.most_common())
+                self.assertEqual([w for w in stat.counter if len(w) == 4], stat.words_with_length(4))
+                stat.subtract(TEXT_SMALL)
+                self.assertEqual((0, 0, []), (stat.words_count, stat.unique_words_count, stat.most_common()))
+
+    def test_frequency_index_after_empty_groups(self):
+        stat = Statistics('b')
+        stat.most_common()
+        stat.update('c b')
+        stat.update('c')
+        stat.less_common()
+        stat.words_with_count(1)
+        stat.subtract('b')
+        self.assertEqual(Counter({'b': 1, 'c': 2}), stat.counter)
+        self.assertEqual([('c', 2), ('b', 1)], stat.most_common())
+        self.assertEqual([('b', 1), ('c', 2)], stat.less_common())
+        self.assertEqual(['b'], stat.words_with_count(1))
+        self.assertEqual([], stat.words_with_count(3))
+
+    def test_frequency_index_random_changes(self):
+        for seed in range(10):
+            with self.subTest(f'Test random changes with seed {seed}'):
+                generator = random.Random(seed)
+                stat = Statistics('', keep_words=False)
+                stat.most_common()
+                for _ in range(300):
+                    text = ' '.join(generator.choices('abcd', k=generator.randint(1, 3)))
+                    if generator.random() < 0.4:
+                        stat.subtract(text)
+                    else:
+                        stat.update(text)
+                    stat.words_with_count(generator.randint(1, 4))
+                self.assertEqual(stat.counter.most_common(), stat.most_common())
+
+    def test_subtract_missing_words(self):
+        for keep_words in (True, False):
+            with self.subTest(f'Test subtract with keep_words={keep_words}'):
+                stat = Statistics('a b', keep_words=keep_words)
+                stat.most_common()
+                stat.subtract('a a c')
+                self.assertEqual(Counter({'b': 1}), stat.counter)
+                self.assertEqual((1, 1), (stat.words_count, stat.unique_words_count))
+                self.assertEqual([('b', 1)], stat.most_common())
+                stat.subtract(Statistics('b b'))
+                self.assertEqual((0, 0), (stat.words_count, stat.unique_words_count))
+
+    def test_update_keeps_counter_order(self):
+        stat = Statistics('a b c b', keep_words=False)
+        stat.most_common()
+        stat.subtract('a b')
+        stat.update('a d d')
+        self.assertEqual(Counter('cbadd'), stat.counter)
+        self.assertEqual(['b', 'c', 'a', 'd'], list(stat.counter))
+        self.assertEqual(stat.counter.most_common(), stat.most_common())
+        self.assertEqual(stat.counter.most_common()[::-1], stat.less_common())
+        self.assertEqual(['b', 'c', 'a'], stat.words_with_count(1))
+        self.assertEqual(['b', 'c', 'a', 'd'], stat.words_with_length(1))
+
+    def test_coverage(self):
+        stat = Statistics('Кот и кот, пошли в лес! Бдыщ')
+        words = get_dictionary('ru').words
+        bloom = BloomFilter.from_keys(words, len(words), error=0.001)
+        params = ('ru', get_dictionary('ru'), set(words), bloom, iter(words))
+        for dictionary in params:
+            with self.subTest(f'Test coverage of {type(dictionary).__name__}'):
+                coverage = stat.coverage(dictionary)
+                self.assertEqual([('кот', 2), ('и', 1), ('в', 1), ('лес', 1)], coverage.known)
+                self.assertEqual([('пошли', 1), ('бдыщ', 1)], coverage.unknown)
+                self.assertEqual((5, 2), (coverage.known_count, coverage.unknown_count))
+                self.assertAlmostEqual(5 / 7, coverage.ratio)
+        coverage = Statistics('hello world').coverage(['world'])
+        self.assertEqual(([('world', 1)], [('hello', 1)]), (coverage.known, coverage.unknown))
+        self.assertEqual(1.0, Statistics('Hello').coverage('en').ratio)
+        self.assertEqual(0.0, Statistics('').coverage().ratio)
+        with self.assertRaises(ValueError):
+            stat.coverage('unknown')
+
+
+class TestWindowedStatistics(TestCase):
+    def test_documents_window(self):
+        stat = WindowedStatistics(documents=2)
+        for text in ('a b', 'b c', 'c d d'):
+            stat.update(text)
+        self.assertEqual(2, len(stat))
+        self.assertEqual(str(Statistics('b c c d d')), str(stat))
+        self.assertEqual([('c', 2), ('d', 2), ('b', 1)], stat.most_common())
+
+    def test_time_window(self):
+        stat = WindowedStatistics(seconds=10)
+        stat.update('a b', timestamp=0)
+        stat.update(Statistics('b c'), timestamp=5)
+        self.assertEqual([('b', 2), ('a', 1), ('c', 1)], stat.most_common())
+        stat.update('d', timestamp=10)
+        self.assertEqual([('b', 1), ('c', 1), ('d', 1)], stat.most_common())
+        stat.expire(20)
+        self.assertEqual((0, 0, 0), (len(stat), stat.words_count, stat.unique_words_count))
+        with self.assertRaises(ValueError):
+            WindowedStatistics()
+
+
+class TestApproximateStatistics(TestCase):
+    def test_small_text_is_exact(self):
+        expected = Statistics(TEXT)
+        stat = ApproximateStatistics(TEXT)
+        self.assertEqual(expected.words_count, stat.words_count)
+        self.assertEqual([(w, c, 0) for w, c in expected.most_common(3)], stat.most_common(3))
+        self.assertEqual(0, stat.max_error())
+        self.assertLess(abs(stat.unique_words_count - expected.unique_words_count), 0.05 * 261)
+
+    def test_update_with_fixed_capacity(self):
+        texts = [' '.join(f'w{i}' for i in range(3000))] + [TEXT_SMALL, TEXT] * 5
+        expected = Statistics(''.join(texts))
+        stat = ApproximateStatistics(capacity=50)
+        for text in texts:
+            stat.update(text)
+        self.assertEqual(expected.words_count, stat.words_count)
+        self.assertEqual(50, len(stat.most_common()))
+        self.assertEqual(['а', 'то'], [word for word, _, _ in stat.most_common(2)])
+        for word, count, error in stat.most_common():
+            with self.subTest(f'Test bounds of {word}'):
+                self.assertLessEqual(count - error, expected.counter[word])
+                self.assertLessEqual(expected.counter[word], count)
+        error = abs(stat.unique_words_count - expected.unique_words_count) / expected.unique_words_count
+        self.assertLess(error, 3 * stat.unique_words_error)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,61 @@
+import os
+import struct
+import tempfile
+from array import array
+from unittest import TestCase, main
+
+from src.chumba import storage
+from src.chumba.storage import read_sections, to_array, write_sections
+
+
+class TestStorage(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'data.bin')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_sections(self):
+        write_sections(self.path, 'test', {'text': b'abc', 'numbers': array('Q', [1, 2, 1 << 63]), 'empty': b''})
+        sections = read_sections(self.path, 'test')
+        self.assertEqual(['text', 'numbers', 'empty'], list(sections))
+        self.assertEqual(b'abc', bytes(sections['text']))
+        self.assertEqual([1, 2, 1 << 63], list(to_array(sections['numbers'], 'Q')))
+        self.assertEqual(b'', bytes(sections['empty']))
+
+    def test_wrong_files(self):
+        write_sections(self.path, 'test', {})
+        with self.assertRaises(ValueError):
+            read_sections(self.path, 'other')
+        with open(self.path, 'r+b') as file:
+            file.seek(4)
+            file.write(struct.pack('<H', storage.FORMAT_VERSION + 1))
+        with self.assertRaises(ValueError):
+            read_sections(self.path, 'test')
+        for content in (b'', b'not a data file at all'):
+            with self.subTest(f'Test content {content}'):
+                with open(self.path, 'wb') as file:
+                    file.write(content)
+                with self.assertRaises(ValueError):
+                    read_sections(self.path, 'test')
+
+    def test_truncated_files(self):
+        write_sections(self.path, 'test', {'text': b'abc', 'numbers': array('Q', [1, 2, 3])})
+        with open(self.path, 'rb') as file:
+            content = file.read()
+        for size in (len(content) - 4, 40, 20):
+            with self.subTest(f'Test file cut to {size} bytes'):
+                with open(self.path, 'wb') as file:
+                    file.write(content[:size])
+                with self.assertRaises(ValueError):
+                    read_sections(self.path, 'test')
+
+    def test_wrong_array_size(self):
+        write_sections(self.path, 'test', {'numbers': b'\1' * 12})
+        with self.assertRaises(ValueError):
+            to_array(read_sections(self.path, 'test')['numbers'], 'Q')
+
+
+if __name__ == '__main__':
+    main()
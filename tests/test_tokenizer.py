@@ -0,0 +1,43 @@
+from collections import Counter
+from unittest import TestCase, main
+
+from src.chumba.tokenizer import Tokenizer
+
+
+class TestTokenizer(TestCase):
+    def test_tokens(self):
+        tokenizer = Tokenizer()
+        self.assertEqual(["Don't", 'stop', '-', 'all-in', '1', '2x'], tokenizer.tokens("Don't stop - all-in, 1 2x!"))
+        self.assertEqual(["Don't", 'stop', 'all-in', '2x'], tokenizer.words("Don't stop - all-in, 1 2x!"))
+
+    def test_count(self):
+        tokenizer = Tokenizer(ignored=['A', '-'])
+        counter = Counter()
+        self.assertEqual(3, tokenizer.count('a B b - c a', counter))
+        self.assertEqual(2, tokenizer.count('B İs', counter))
+        self.assertEqual(Counter({'b': 3, 'c': 1, 'i̇s': 1}), counter)
+        self.assertEqual(2, tokenizer.count('ΑΣ.Β', counter))
+        self.assertEqual(['ας', 'β'], tokenizer.lowered_words('ΑΣ.Β'))
+        self.assertEqual(['ας', 'β'], [e.lower() for e in tokenizer.words('ΑΣ.Β')])
+        self.assertEqual(1, counter['ας'])
+
+    def test_border(self):
+        tokenizer = Tokenizer()
+        params = (
+            (0, ''),
+            (3, 'ab '),
+            (3, 'ab cd'),
+            (0, 'abcd'),
+            (3, "ab don't"),
+        )
+        for expected, text in params:
+            with self.subTest(f'Test border of {text}'):
+                self.assertEqual(expected, tokenizer.border(text))
+
+    def test_join_words(self):
+        parts = list(Tokenizer().join_words(['на ме', 'ли мы', ' на', 'лима']))
+        self.assertEqual(['на ', 'мели ', 'мы ', '', 'налима'], parts)
+
+
+if __name__ == '__main__':
+    main()
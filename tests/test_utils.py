@@ -0,0 +1,38 @@
+from unittest import TestCase, main
+
+from src.chumba.utils import LRUCache, from_generator, Lang
+
+
+class TestUtils(TestCase):
+    def test_from_generator(self):
+        params = (
+            ([1, 2, 3], -1),
+            ([1, 2, 3], 0),
+            ([1], 1),
+            ([1, 2, 3], 10),
+        )
+        for expected, limit in params:
+            with self.subTest(f'Test limit {limit}'):
+                self.assertEqual(expected, from_generator(iter([1, 2, 3]), limit))
+
+    def test_alphabet(self):
+        self.assertEqual(33, len(Lang.RU.alphabet))
+        self.assertEqual(26, len(Lang.EN.alphabet))
+
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual(0, cache.get('b', 0))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == '__main__':
+    main()
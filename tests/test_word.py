@@ -1,9 +1,14 @@
-from unittest import TestCase, main
+import re
+from unittest import TestCase, main, skipIf
 
+from src.chumba.conditions import _compile_pattern, edit_distance
+from src.chumba.index import numpy
+from src.chumba.utils import read_data_file
 from src.chumba.word import Word, Lang
 
 DATA = ['ёкать', 'ёмкий', 'ёрник', 'аббат', 'абзац', 'аборт', 'абрек', 'абрис', 'авизо', 'аврал', 'автол', 'агент',
         'агнец', 'адепт', 'адрес']
+ENGINES = ['index'] if numpy is None else ['index', 'numpy']
 
 
 class TestWord(TestCase):
@@ -19,6 +24,11 @@ class TestWord(TestCase):
         self.assertEqual(word._length, 10)
         self.assertEqual(word._lang, Lang.EN.value)
 
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError) as e:
+            Word(10, engine='gpu')
+        self.assertEqual(str(e.exception), "Engine should be one of ['index', 'numpy'], got gpu")
+
     def test_limit(self):
         params = (
             (DATA, -1),
@@ -241,6 +251,18 @@ class TestWord(TestCase):
         result = word.examples(5)
         self.assertEqual(['ёмкий'], result)
 
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_five_conditions_numpy_engine(self):
+        word = Word(5, engine='numpy')
+        word._cached = DATA
+        word.starts_with('ё')
+        word.ends_with('й')
+        word.letter_at_index_is(2, 'к')
+        word.contains('м', 'и')
+        word.not_contains('ф', 'а')
+        result = word.examples(5)
+        self.assertEqual(['ёмкий'], result)
+
     def test_five_conditions_without_length(self):
         word = Word()
         word._cached = DATA
@@ -278,6 +300,284 @@ class TestWord(TestCase):
                     word.starts_with(letter)
                 self.assertEqual(expected, word.examples_count())
 
+    def test_pattern(self):
+        params = (
+            (['аббат', 'абзац', 'аборт', 'абрек', 'абрис'], 'аб___'),
+            (['аббат', 'абзац', 'аборт', 'абрек', 'абрис'], 'АБ___'),
+            (['абзац', 'агнец'], '____ц'),
+            (['агнец'], 'а_н_ц'),
+            ([], 'а_н_'),
+            (DATA, '_____'),
+            (['агнец'], 'а?н?ц'),
+            (['ёкать', 'ёмкий', 'ёрник'], 'ё*'),
+            (['ёмкий', 'ёрник', 'абрис', 'авизо', 'амортизация'], '*и*'),
+            (['абзац', 'агнец'], 'а*ц'),
+            (['абзац', 'агнец'], 'а**ц'),
+            (['аббат', 'аборт', 'агент', 'адепт'], 'а*т'),
+            (['ёмкий', 'ёрник', 'абрис', 'авизо', 'амортизация'], '?*и?*'),
+            (['амортизация'], 'а?о*з*ия'),
+            (['аббат', 'абзац', 'аборт', 'абрек', 'абрис'], 'аб*?'),
+            ([], 'аббат?*'),
+        )
+        for expected, pattern in params:
+            with self.subTest(f'Test pattern {pattern}'):
+                word = Word.pattern(pattern)
+                word._cached = DATA + ['амортизация']
+                self.assertEqual(expected, word.examples())
+
+    def test_pattern_with_other_conditions(self):
+        word = Word.pattern('а*')
+        word._cached = DATA
+        word.not_contains('б')
+        word.ends_with('л')
+        self.assertEqual(['аврал', 'автол'], word.examples())
+
+    def test_pattern_is_compiled_once(self):
+        Word.pattern('К?Т*')
+        hits = _compile_pattern.cache_info().hits
+        Word.pattern('к_т**')
+        self.assertEqual(hits + 1, _compile_pattern.cache_info().hits)
+
+    def test_regex(self):
+        params = (
+            (['аббат', 'абзац'], 'аб[бз]а.'),
+            (['аббат', 'абзац'], 'АБ[бз]а.'),
+            (['ёмкий', 'ёрник'], 'ё.*[ий].?'),
+            ([], 'аб'),
+        )
+        for expected, expression in params:
+            with self.subTest(f'Test regex {expression}'):
+                word = Word.regex(expression)
+                word._cached = DATA
+                self.assertEqual(expected, word.examples())
+
+    def test_regex_raises_when_not_valid(self):
+        with self.assertRaises(re.error):
+            Word.regex('а[')
+
+    def test_pattern_raises_when_empty(self):
+        with self.assertRaises(ValueError) as e:
+            Word.pattern('')
+        self.assertEqual(str(e.exception), "Pattern should not be empty")
+
+    def test_examples_many(self):
+        word = Word(5)
+        word._cached = DATA
+        word.contains('и')
+        other = Word(5)
+        other._cached = DATA
+        other.letter_at_index_is(1, 'б')
+        results = Word.examples_many([word, other, word], limit=3)
+        expected = [['ёмкий', 'ёрник', 'абрис'], ['аббат', 'абзац', 'аборт'], ['ёмкий', 'ёрник', 'абрис']]
+        self.assertEqual(expected, results)
+
+    def test_examples_many_patterns(self):
+        patterns = ['кот', 'к_т', 'ко_', '_от', 'к__', 'дом']
+        results = Word.examples_many(patterns)
+        self.assertEqual([Word.pattern(e).examples() for e in patterns], results)
+        self.assertEqual(['кот'], results[0])
+
+    def test_examples_many_empty(self):
+        self.assertEqual([], Word.examples_many([]))
+
+    def test_examples_are_cached_until_condition_added(self):
+        word = Word(5)
+        word._cached = DATA
+        word.starts_with('а')
+        selected = word._select()
+        self.assertIs(selected, word._select())
+        self.assertEqual(12, word.examples_count())
+        word.ends_with('т')
+        self.assertEqual(['аббат', 'аборт', 'агент', 'адепт'], word.examples())
+        self.assertEqual(4, word.examples_count())
+
+    def test_same_conditions_share_results(self):
+        first = Word(5)
+        first.starts_with('аб')
+        first.contains('р')
+        second = Word(5)
+        second.contains('р')
+        second.starts_with('АБ')
+        self.assertIs(first._select(), second._select())
+        self.assertEqual(['аборт', 'абрек', 'абрис'], second.examples())
+
+    def test_results_are_narrowed(self):
+        word = Word(5)
+        word._cached = DATA
+        word.starts_with('а')
+        self.assertEqual(12, word.examples_count())
+        word.contains('р')
+        self.assertEqual(['аборт', 'абрек', 'абрис', 'аврал', 'адрес'], word.examples())
+        word.letter_at_index_is(2, 'р')
+        self.assertEqual(['абрек', 'абрис', 'аврал', 'адрес'], word.examples())
+        self.assertEqual([(2, 12), (3, 5), (4, 4)], [(e, len(ids)) for e, ids in word._snapshots])
+
+    def test_undo(self):
+        word = Word(5)
+        word._cached = DATA
+        word.starts_with('а')
+        word.contains('р', 'е')
+        self.assertEqual(['абрек', 'адрес'], word.examples())
+        word.undo()
+        self.assertEqual(2, len(word._conditions))
+        self.assertEqual(12, word.examples_count())
+        word.undo()
+        self.assertEqual(DATA, word.examples(-1))
+        with self.assertRaises(ValueError) as e:
+            word.undo()
+        self.assertEqual(str(e.exception), "There are no conditions to undo")
+
+    def test_fork(self):
+        word = Word(5)
+        word._cached = DATA
+        word.starts_with('аб')
+        self.assertEqual(5, word.examples_count())
+        other = word.fork()
+        other.ends_with('т')
+        word.ends_with('с')
+        self.assertEqual(['аббат', 'аборт'], other.examples())
+        self.assertEqual(['абрис'], word.examples())
+        other.undo()
+        self.assertEqual(5, other.examples_count())
+
+    def test_iter_examples(self):
+        word = Word(5)
+        word._cached = DATA
+        word.starts_with('а')
+        results = word.iter_examples()
+        self.assertEqual('аббат', next(results))
+        word.contains('р')
+        self.assertEqual(DATA[4:], list(results))
+        self.assertEqual(['абрис', 'аврал', 'адрес'], list(word.iter_examples(2)))
+        self.assertEqual([], list(word.iter_examples(10)))
+        with self.assertRaises(ValueError):
+            word.iter_examples(-1)
+
+    def test_iter_examples_is_lazy(self):
+        for engine in ENGINES:
+            with self.subTest(f'Test lazy iteration with engine {engine}'):
+                word = Word.regex('.*(ость|ение)', engine=engine)
+                results = word.iter_examples()
+                first = next(results)
+                self.assertEqual([], word._snapshots)
+                found = [first] + list(results)
+                self.assertEqual([1], [count for count, _ in word._snapshots])
+                self.assertEqual(found, word.examples(-1))
+                word.ends_with('ие')
+                found = list(word.iter_examples())
+                self.assertEqual([1, 2], [count for count, _ in word._snapshots])
+                self.assertEqual(found, word.examples(-1))
+
+    def test_page(self):
+        word = Word(5)
+        word._cached = DATA
+        word.starts_with('а')
+        pages = [word.page(offset, 5) for offset in range(0, 15, 5)]
+        self.assertEqual([DATA[3:8], DATA[8:13], DATA[13:]], pages)
+        self.assertEqual(1, len(word._snapshots))
+        self.assertEqual([], word.page(12, 5))
+        self.assertEqual(word.examples(), [e for page in pages for e in page])
+        for offset, size in ((-1, 5), (0, 0), (0, -1)):
+            with self.subTest(f'Test page {offset} {size}'):
+                with self.assertRaises(ValueError):
+                    word.page(offset, size)
+
+    def test_pages_of_same_conditions_share_results(self):
+        first, second = Word(5), Word(5)
+        first.starts_with('ма')
+        second.starts_with('ма')
+        self.assertEqual(first.examples(10), first.page(0, 10))
+        self.assertEqual(first.examples(20)[10:], second.page(10, 10))
+        self.assertIs(first._select(), second._select())
+
+    def test_anagram_of(self):
+        params = (
+            (['кот', 'кто'], 'ток', 0, 'ru'),
+            (['спорт', 'строп'], 'ПОРТС', 5, 'ru'),
+            (['night', 'thing'], 'thing', 0, 'en'),
+            ([], 'тттт', 0, 'ru'),
+        )
+        for expected, letters, length, lang in params:
+            for engine in ENGINES:
+                with self.subTest(f'Test anagram {letters} {engine}'):
+                    word = Word(length, lang == 'ru', engine)
+                    word.anagram_of(letters)
+                    self.assertEqual(expected, word.examples())
+
+    def test_made_of(self):
+        params = (
+            (['кот', 'кто', 'око', 'ото', 'сок', 'сто'], 'откос', 3),
+            (['кот', 'кто', 'око', 'окот', 'ото', 'скот', 'сок', 'сто', 'сток'], 'откос', 0),
+            ([], 'откос', 5),
+        )
+        for expected, letters, length in params:
+            for engine in ENGINES:
+                with self.subTest(f'Test made of {letters} {length} {engine}'):
+                    word = Word(length, engine=engine)
+                    word.made_of(letters)
+                    self.assertEqual(expected, [e for e in word.examples() if len(e) > 2])
+
+    def test_made_of_long_letters_is_same_as_check(self):
+        letters, words = 'достопримечательность', read_data_file('ru')
+        word = Word(7)
+        word.made_of(letters)
+        word.starts_with('с')
+        expected = [e for e in words if len(e) == 7 and e.startswith('с')
+                    and all(e.count(x) <= letters.count(x) for x in e)]
+        self.assertEqual(expected, word.examples())
+        word.undo()
+        self.assertEqual(word.examples_count(), len([e for e in words if len(e) == 7
+                                                     and all(e.count(x) <= letters.count(x) for x in e)]))
+
+    def test_anagram_raises_when_wrong(self):
+        params = (
+            ('Letters should not be empty', 0, ''),
+            ('Number of letters 2 is not equal to word length(3)', 3, 'ab'),
+        )
+        for message, length, letters in params:
+            with self.subTest(f'Test anagram {letters}'):
+                with self.assertRaises(ValueError) as e:
+                    Word(length).anagram_of(letters)
+                self.assertEqual(message, str(e.exception))
+        with self.assertRaises(ValueError):
+            Word().made_of('')
+
+    def test_similar_to(self):
+        params = (
+            (['кот'], 'КОТ', 0, 0, ''),
+            (['дот', 'йот', 'кат', 'киот', 'кит', 'ко', 'код', 'кой', 'кол', 'ком', 'кон', 'корт', 'кот', 'кош', 'кошт',
+              'крот', 'лот', 'мот', 'окот', 'от', 'пот', 'рот', 'скот', 'тот'], 'кот', 1, 0, ''),
+            (['киот', 'корт', 'кошт', 'крот'], 'кот', 1, 4, 'к'),
+            (['привет'], 'прювет', 1, 0, ''),
+        )
+        for expected, similar, distance, length, prefix in params:
+            for engine in ENGINES:
+                with self.subTest(f'Test similar to {similar} {distance} {engine}'):
+                    word = Word(length, engine=engine)
+                    word.similar_to(similar, distance)
+                    word.starts_with(prefix)
+                    self.assertEqual(expected, word.examples())
+
+    def test_similar_to_is_same_as_distance(self):
+        words = read_data_file('en')
+        for similar, distance, length in (('thing', 1, 0), ('thing', 2, 0), ('nothing', 2, 6), ('aa', 2, 0)):
+            with self.subTest(f'Test similar to {similar} {distance}'):
+                word = Word(length, is_ru=False)
+                word.similar_to(similar, distance)
+                expected = [e for e in words if edit_distance(e, similar) <= distance and (not length or len(e) == length)]
+                self.assertEqual(expected, word.examples())
+
+    def test_similar_to_raises_when_wrong(self):
+        params = (
+            ('Word should not be empty', '', 1),
+            ('Distance should not be negative, got -1', 'кот', -1),
+        )
+        for message, similar, distance in params:
+            with self.subTest(f'Test similar to {similar} {distance}'):
+                with self.assertRaises(ValueError) as e:
+                    Word().similar_to(similar, distance)
+                self.assertEqual(message, str(e.exception))
+
 
 if __name__ == '__main__':
     main()